@@ -12,6 +12,9 @@ set -e
 PROJECT_ID="${GOOGLE_CLOUD_PROJECT:-eda-gemini-dev}"
 REGION="${GCP_REGION:-us-central1}"
 
+# "pull" also deploys the batching BigQuery writer subscriber (see setup-triggers.sh)
+BIGQUERY_WRITER_MODE="${BIGQUERY_WRITER_MODE:-push}"
+
 # Derived names
 BUCKET_PREFIX="${PROJECT_ID}-invoices"
 INPUT_BUCKET="${BUCKET_PREFIX}-input"
@@ -52,12 +55,10 @@ ENV_VARS="$ENV_VARS,EXTRACTED_TOPIC=$EXTRACTED_TOPIC"
 ENV_VARS="$ENV_VARS,BQ_DATASET=invoices"
 ENV_VARS="$ENV_VARS,GEMINI_MODEL=gemini-2.0-flash-exp"
 
-# Helper function to build and deploy
-deploy_function() {
+# Helper function to build an image with Cloud Build
+build_image() {
     local NAME=$1
     local DOCKERFILE=$2
-    local MEMORY=$3
-    local TIMEOUT=$4
 
     echo ""
     echo "Building $NAME..."
@@ -82,6 +83,16 @@ EOF
         --config="/tmp/cloudbuild-${NAME}.yaml" \
         --quiet \
         .
+}
+
+# Helper function to build and deploy
+deploy_function() {
+    local NAME=$1
+    local DOCKERFILE=$2
+    local MEMORY=$3
+    local TIMEOUT=$4
+
+    build_image "$NAME" "$DOCKERFILE"
 
     echo "Deploying $NAME to Cloud Run..."
     gcloud run deploy "$NAME" \
@@ -119,11 +130,31 @@ echo ""
 echo "[4/4] bigquery-writer"
 deploy_function "bigquery-writer" "deploy/bigquery_writer.Dockerfile" "512Mi" "120"
 
+# Optional: streaming-pull BigQuery writer. Deployed as a worker pool since it
+# serves no HTTP traffic and must keep its CPU between messages.
+if [ "$BIGQUERY_WRITER_MODE" = "pull" ]; then
+    echo ""
+    echo "[+] bigquery-writer-subscriber"
+    build_image "bigquery-writer-subscriber" "deploy/bigquery_writer_subscriber.Dockerfile"
+
+    echo "Deploying bigquery-writer-subscriber to Cloud Run worker pool..."
+    gcloud beta run worker-pools deploy "bigquery-writer-subscriber" \
+        --image="gcr.io/$PROJECT_ID/bigquery-writer-subscriber:latest" \
+        --region="$REGION" \
+        --project="$PROJECT_ID" \
+        --memory="512Mi" \
+        --scaling=1 \
+        --set-env-vars="$ENV_VARS,EXTRACTED_SUBSCRIPTION=invoice-extracted-bigquery-writer" \
+        --quiet
+
+    echo "✓ bigquery-writer-subscriber deployed successfully"
+fi
+
 echo ""
 echo "============================================="
 echo "✅ All Functions Deployed!"
 echo "============================================="
 echo ""
 echo "Next step: Create Pub/Sub subscriptions with:"
-echo "  ./scripts/setup-triggers.sh"
+echo "  BIGQUERY_WRITER_MODE=$BIGQUERY_WRITER_MODE ./scripts/setup-triggers.sh"
 echo ""
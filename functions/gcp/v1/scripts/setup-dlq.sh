@@ -49,9 +49,15 @@ declare -A SUBSCRIPTIONS=(
     ["tiff-to-png-sub"]="invoice-uploaded-dlq"
     ["classifier-sub"]="invoice-converted-dlq"
     ["extractor-sub"]="invoice-classified-dlq"
-    ["writer-sub"]="invoice-extracted-dlq"
 )
 
+# BigQuery writer subscription depends on BIGQUERY_WRITER_MODE (see setup-triggers.sh)
+if [ "${BIGQUERY_WRITER_MODE:-push}" = "pull" ]; then
+    SUBSCRIPTIONS["invoice-extracted-bigquery-writer"]="invoice-extracted-dlq"
+else
+    SUBSCRIPTIONS["writer-sub"]="invoice-extracted-dlq"
+fi
+
 echo "📋 Step 1: Creating DLQ subscriptions..."
 echo ""
 
@@ -11,6 +11,11 @@ set -e
 PROJECT_ID="${GOOGLE_CLOUD_PROJECT:-eda-gemini-dev}"
 REGION="${GCP_REGION:-us-central1}"
 
+# BigQuery writer mode: "push" (bigquery-writer function, default) or "pull"
+# (bigquery-writer-subscriber worker pool, batched writes). Only one of them
+# may consume invoice-extracted, or every invoice is processed twice.
+BIGQUERY_WRITER_MODE="${BIGQUERY_WRITER_MODE:-push}"
+
 echo "============================================="
 echo "Setting up Pub/Sub Triggers"
 echo "============================================="
@@ -65,12 +70,36 @@ create_subscription() {
     fi
 }
 
+# Pull subscription for a long-running subscriber (no push endpoint)
+create_pull_subscription() {
+    local SUB_NAME=$1
+    local TOPIC=$2
+    local ACK_DEADLINE=$3
+
+    if gcloud pubsub subscriptions describe "$SUB_NAME" --project="$PROJECT_ID" &>/dev/null; then
+        echo "  ✓ $SUB_NAME (exists)"
+    else
+        gcloud pubsub subscriptions create "$SUB_NAME" \
+            --topic="$TOPIC" \
+            --ack-deadline="$ACK_DEADLINE" \
+            --project="$PROJECT_ID" \
+            --quiet
+        echo "  ✓ $SUB_NAME (created)"
+    fi
+}
+
 echo ""
 echo "Creating Pub/Sub subscriptions..."
 create_subscription "tiff-to-png-sub" "invoice-uploaded" "tiff-to-png-converter" 300
 create_subscription "classifier-sub" "invoice-converted" "invoice-classifier" 300
 create_subscription "extractor-sub" "invoice-classified" "data-extractor" 540
-create_subscription "writer-sub" "invoice-extracted" "bigquery-writer" 120
+
+if [ "$BIGQUERY_WRITER_MODE" = "pull" ]; then
+    # Pulled by bigquery-writer-subscriber (EXTRACTED_SUBSCRIPTION)
+    create_pull_subscription "invoice-extracted-bigquery-writer" "invoice-extracted" 120
+else
+    create_subscription "writer-sub" "invoice-extracted" "bigquery-writer" 120
+fi
 
 echo ""
 echo "============================================="
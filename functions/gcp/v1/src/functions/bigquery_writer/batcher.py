@@ -0,0 +1,124 @@
+"""Bounded-latency batching for bulk BigQuery writes.
+
+Buffers prepared invoices handed over by the streaming-pull callback and
+flushes them in one bulk write when the batch is full or the oldest
+buffered invoice has waited longer than the configured maximum.
+Pub/Sub messages are acked only after their batch is persisted and
+nacked (redelivered) if the flush fails.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class InvoiceBatcher:
+    """Thread-safe buffer that flushes by size or by age.
+
+    Pub/Sub invokes message callbacks from a thread pool, so the buffer
+    is guarded by a lock and flushes are serialized. A daemon thread
+    enforces the max-wait bound when traffic is too low to fill a batch.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list[Any]], Any],
+        batch_size: int = 500,
+        max_wait_ms: int = 1000,
+    ):
+        """Initialize batcher and start the max-wait timer thread.
+
+        Args:
+            flush: Callable that persists a list of buffered items (raises on failure)
+            batch_size: Flush once this many items are buffered
+            max_wait_ms: Flush once the oldest buffered item is this old
+        """
+        self._flush_fn = flush
+        self._batch_size = batch_size
+        self._max_wait_s = max_wait_ms / 1000
+        # (item, ack, nack, enqueue time) in arrival order
+        self._buffer: deque[tuple[Any, Callable[[], None], Callable[[], None], float]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer = threading.Thread(
+            target=self._run_timer, name="bigquery-batch-timer", daemon=True
+        )
+        self._timer.start()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def add(self, item: Any, ack: Callable[[], None], nack: Callable[[], None]) -> None:
+        """Buffer an item, flushing if the batch is now full.
+
+        Args:
+            item: Prepared item to persist
+            ack: Called once the item's batch is persisted
+            nack: Called if the item's batch fails to persist
+        """
+        with self._lock:
+            self._buffer.append((item, ack, nack, time.monotonic()))
+            is_full = len(self._buffer) >= self._batch_size
+
+        if is_full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Flush up to one batch of buffered items.
+
+        Returns:
+            Number of items persisted (0 if empty or on failure)
+        """
+        with self._flush_lock:
+            with self._lock:
+                count = min(len(self._buffer), self._batch_size)
+                entries = [self._buffer.popleft() for _ in range(count)]
+
+            if not entries:
+                return 0
+
+            try:
+                self._flush_fn([item for item, _, _, _ in entries])
+            except Exception as e:
+                logger.exception(
+                    "Batch flush failed - messages will be redelivered",
+                    extra={
+                        "error": str(e),
+                        "error_type": type(e).__name__,
+                        "batch_size": len(entries),
+                    },
+                )
+                for _, _, nack, _ in entries:
+                    nack()
+                return 0
+
+            for _, ack, _, _ in entries:
+                ack()
+
+            logger.info("Batch flushed to BigQuery", extra={"batch_size": len(entries)})
+            return len(entries)
+
+    def close(self) -> None:
+        """Stop the timer thread and flush everything still buffered."""
+        self._closed.set()
+        self._timer.join()
+        while len(self):
+            self.flush()
+
+    def _run_timer(self) -> None:
+        """Flush when the oldest buffered item exceeds the max wait."""
+        interval = max(self._max_wait_s / 4, 0.01)
+        while not self._closed.wait(interval):
+            with self._lock:
+                is_due = (
+                    bool(self._buffer) and time.monotonic() - self._buffer[0][3] >= self._max_wait_s
+                )
+            if is_due:
+                self.flush()
@@ -0,0 +1,456 @@
+"""Failure recording shared by the BigQuery writer entry points.
+
+Failed messages are recorded in the metrics table and as structured
+error files in the failed bucket for downstream agentic processing.
+The push handler uploads error files before returning; the always-on
+streaming subscriber queues them on a background flusher thread.
+"""
+
+import atexit
+import logging
+import queue
+import re
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from google.api_core.exceptions import PreconditionFailed
+from pydantic import ValidationError
+
+from shared.adapters import GCPBigQueryAdapter
+from shared.schemas.invoice import VendorType
+from shared.schemas.messages import InvoiceExtractedMessage
+
+from .processing import get_gcs_adapter, reset_adapters_on_connection_error
+from .writer import write_extraction_metrics
+
+logger = logging.getLogger(__name__)
+
+_UTC = timezone.utc
+
+_PAGE_SUFFIX_RE = re.compile(r"_page\d+$")
+
+# (error type substrings, hint template) - first matching rule wins
+_HINT_RULES: list[tuple[frozenset[str], str]] = [
+    (
+        frozenset({"greater_than", "less_than"}),
+        "Field '{field}' has numeric constraint violation. "
+        "Check if this is a discount/credit that should be handled differently.",
+    ),
+    (
+        frozenset({"missing"}),
+        "Required field '{field}' is missing. Review extraction prompt for this field.",
+    ),
+    (
+        frozenset({"string_type", "type_error"}),
+        "Field '{field}' has wrong type. Check LLM output format for this field.",
+    ),
+]
+
+
+# Error files waiting to be uploaded by the streaming subscriber:
+# (project_id, bucket, path, data, ack, nack). None is the shutdown sentinel.
+_QueuedFailure = tuple[str, str, str, bytes, Callable[[], None], Callable[[], None]]
+_FAILURE_QUEUE: queue.Queue[_QueuedFailure | None] = queue.Queue()
+
+# Upper bound on how long shutdown waits for queued error files
+_FAILURE_DRAIN_TIMEOUT_SECONDS = 8.0
+
+
+def _upload_failure(project_id: str, bucket: str, path: str, data: bytes) -> str:
+    """Upload one error file with the cached GCS adapter.
+
+    Uploads are create-only, so a redelivered message never overwrites
+    the error file already written for it.
+
+    Returns:
+        GCS URI of the error file
+    """
+    try:
+        return get_gcs_adapter(project_id).write(
+            bucket=bucket,
+            path=path,
+            data=data,
+            content_type="application/json",
+            if_generation_match=0,
+        )
+    except PreconditionFailed:
+        gcs_uri = f"gs://{bucket}/{path}"
+        logger.info("Failure already recorded", extra={"path": gcs_uri})
+        return gcs_uri
+
+
+def _upload_queued_failures() -> None:
+    """Upload queued error files until the shutdown sentinel arrives.
+
+    Runs on the failure flusher thread, reusing the cached GCS adapter (and
+    its HTTP session) for every upload. Each message is acked once its
+    error file is written and nacked (redelivered) if the upload fails.
+    """
+    while True:
+        item = _FAILURE_QUEUE.get()
+        try:
+            if item is None:
+                return
+
+            project_id, bucket, path, data, ack, nack = item
+            try:
+                _upload_failure(project_id, bucket, path, data)
+            except Exception as e:
+                logger.error(
+                    "Failed to write error file to bucket",
+                    extra={
+                        "write_error": str(e),
+                        "error_type": type(e).__name__,
+                        "path": f"gs://{bucket}/{path}",
+                    },
+                )
+                reset_adapters_on_connection_error(e)
+                nack()
+            else:
+                ack()
+        finally:
+            _FAILURE_QUEUE.task_done()
+
+
+def drain_failure_queue() -> None:
+    """Upload everything queued, then stop the failure flusher.
+
+    Called on shutdown by the subscriber and at interpreter exit; safe to
+    call more than once. Error files still queued after the drain timeout
+    are left unacked, so their messages are redelivered.
+    """
+    if not _start_failure_flusher.cache_info().currsize:
+        return
+
+    thread = _start_failure_flusher()
+    _FAILURE_QUEUE.put(None)
+    _start_failure_flusher.cache_clear()
+    thread.join(timeout=_FAILURE_DRAIN_TIMEOUT_SECONDS)
+
+
+@lru_cache(maxsize=1)
+def _start_failure_flusher() -> threading.Thread:
+    """Start the background thread that uploads queued error files.
+
+    Only the always-on streaming subscriber queues uploads: on
+    request-billed Cloud Run the thread gets no CPU once the response is
+    sent. Started on first use so importing the module has no side
+    effects. The queue is drained at interpreter exit.
+    """
+    thread = threading.Thread(target=_upload_queued_failures, name="failure-flusher", daemon=True)
+    thread.start()
+    atexit.unregister(drain_failure_queue)
+    atexit.register(drain_failure_queue)
+    return thread
+
+
+def record_failure(
+    config: Any,
+    bq_adapter: GCPBigQueryAdapter,
+    source_file: str,
+    invoice_id: str,
+    error: Exception,
+    raw_message: dict[str, Any],
+    message: InvoiceExtractedMessage | None,
+    errors_list: list[Any] | None = None,
+    ack: Callable[[], None] | None = None,
+    nack: Callable[[], None] | None = None,
+) -> str | None:
+    """Record a failed message in the metrics table and the failed bucket.
+
+    Both writes are best effort: a failure here is logged and never
+    propagated, so the message is still acknowledged. errors_list is the
+    caller's already-computed error.errors() for a ValidationError.
+
+    When ack and nack are given, the error file is queued for the failure
+    flusher instead of written before returning, and the flusher acks the
+    message once the file is written (nacks if the upload fails).
+
+    Returns:
+        GCS URI of the error file, or None if it could not be written
+    """
+    try:
+        write_extraction_metrics(
+            bq_adapter=bq_adapter,
+            dataset=config.dataset,
+            metrics_table=config.metrics_table,
+            invoice_id=invoice_id,
+            vendor_type=message.vendor_type if message is not None else VendorType.OTHER,
+            source_file=source_file,
+            extraction_model=message.extraction_model if message is not None else "unknown",
+            extraction_latency_ms=message.extraction_latency_ms if message is not None else 0,
+            confidence_score=0.0,
+            success=False,
+            error_message=str(error),
+        )
+    except Exception:
+        pass
+
+    try:
+        return _write_failure_to_bucket(
+            config=config,
+            source_file=source_file,
+            invoice_id=invoice_id,
+            error=error,
+            raw_message=raw_message,
+            message=message,
+            errors_list=errors_list,
+            ack=ack,
+            nack=nack,
+        )
+    except Exception as write_error:
+        logger.error(
+            "Failed to write error file to bucket",
+            extra={
+                "original_error": str(error),
+                "write_error": str(write_error),
+                "source_file": source_file,
+            },
+        )
+        reset_adapters_on_connection_error(write_error)
+        return None
+
+
+def _write_failure_to_bucket(
+    config: Any,
+    source_file: str,
+    invoice_id: str,
+    error: Exception,
+    raw_message: dict[str, Any],
+    message: InvoiceExtractedMessage | None,
+    errors_list: list[Any] | None = None,
+    ack: Callable[[], None] | None = None,
+    nack: Callable[[], None] | None = None,
+) -> str:
+    """Write structured error record to failed bucket for agentic processing.
+
+    Creates a JSON file with comprehensive error context that downstream
+    agents can use for automated remediation or escalation.
+
+    Args:
+        config: Application configuration
+        source_file: Original source file GCS URI
+        invoice_id: Invoice ID if available
+        error: The exception that caused the failure
+        raw_message: Raw Pub/Sub message payload
+        message: Parsed message if available
+        errors_list: Already-computed error.errors() for a ValidationError
+        ack: Queue the upload on the failure flusher thread instead of
+            writing before returning, and call this once it is written
+            (only for the always-on subscriber)
+        nack: Called instead of ack if the queued upload fails
+
+    Returns:
+        GCS URI of the error file
+    """
+    timestamp = datetime.now(_UTC)
+    error_record = _create_error_record(
+        source_file=source_file,
+        invoice_id=invoice_id,
+        error=error,
+        raw_message=raw_message,
+        message=message,
+        timestamp=timestamp,
+        errors_list=errors_list,
+    )
+
+    error_filename = _generate_error_filename(source_file, invoice_id)
+    error_json = orjson.dumps(error_record, default=str, option=orjson.OPT_INDENT_2)
+
+    if ack is None or nack is None:
+        return _upload_failure(config.project_id, config.failed_bucket, error_filename, error_json)
+
+    _start_failure_flusher()
+    _FAILURE_QUEUE.put(
+        (config.project_id, config.failed_bucket, error_filename, error_json, ack, nack)
+    )
+
+    return f"gs://{config.failed_bucket}/{error_filename}"
+
+
+def _create_error_record(
+    source_file: str,
+    invoice_id: str,
+    error: Exception,
+    raw_message: dict[str, Any],
+    message: InvoiceExtractedMessage | None,
+    timestamp: datetime,
+    errors_list: list[Any] | None = None,
+) -> dict[str, Any]:
+    """Create structured error record for agentic processing.
+
+    The error record follows a schema designed for AI agents to:
+    1. Understand the failure context
+    2. Identify root cause from validation errors
+    3. Suggest or execute remediation steps
+
+    Returns:
+        Structured error record ready for JSON serialization
+    """
+    errors = errors_list
+    if errors is None and isinstance(error, ValidationError):
+        errors = error.errors()
+
+    validation_details = None
+    if errors is not None:
+        validation_details = {
+            "error_count": error.error_count(),
+            "errors": [
+                {
+                    "field": ".".join(map(str, err["loc"])),
+                    "type": err["type"],
+                    "message": err["msg"],
+                    "input": str(err.get("input", ""))[:200],
+                }
+                for err in errors
+            ],
+        }
+
+    vendor_type = "unknown"
+    extraction_model = "unknown"
+    confidence_score = 0.0
+    extracted_data = {}
+
+    if message is not None:
+        vendor_type = message.vendor_type.value
+        extraction_model = message.extraction_model
+        confidence_score = message.confidence_score
+        extracted_data = message.extracted_data
+
+    extracted_data, truncated_extracted = _truncate_for_error(extracted_data, path="extracted_data")
+    raw_message, truncated_raw = _truncate_for_error(raw_message, path="raw_message")
+    truncated_fields = truncated_extracted + truncated_raw
+
+    return {
+        "error_metadata": {
+            "timestamp": timestamp.isoformat(),
+            "failed_stage": "bigquery-writer",
+            "error_type": type(error).__name__,
+            "error_message": str(error),
+            "is_validation_error": isinstance(error, ValidationError),
+            "validation_details": validation_details,
+            "truncated": bool(truncated_fields),
+            "truncated_fields": truncated_fields,
+        },
+        "invoice_context": {
+            "source_file": source_file,
+            "invoice_id": invoice_id,
+            "vendor_type": vendor_type,
+            "extraction_model": extraction_model,
+            "confidence_score": confidence_score,
+        },
+        "extracted_data": extracted_data,
+        "raw_message": raw_message,
+        "remediation_hints": _generate_remediation_hints(error, errors),
+    }
+
+
+def _truncate_for_error(
+    obj: Any, max_str: int = 2000, max_list: int = 50, path: str = ""
+) -> tuple[Any, list[str]]:
+    """Trim long strings and lists so error records stay small.
+
+    Dicts and lists are rebuilt rather than mutated, so the caller's
+    payload is left untouched.
+
+    Args:
+        obj: JSON-like value to trim
+        max_str: Maximum characters kept per string
+        max_list: Maximum items kept per list
+        path: Dotted path of obj, used to report what was cut
+
+    Returns:
+        Tuple of (trimmed value, paths of truncated fields)
+    """
+    if isinstance(obj, str):
+        if len(obj) > max_str:
+            return obj[:max_str], [path]
+        return obj, []
+
+    truncated: list[str] = []
+
+    if isinstance(obj, dict):
+        trimmed_dict = {}
+        for key, value in obj.items():
+            child_path = f"{path}.{key}" if path else str(key)
+            trimmed_dict[key], child_truncated = _truncate_for_error(
+                value, max_str, max_list, child_path
+            )
+            truncated.extend(child_truncated)
+        return trimmed_dict, truncated
+
+    if isinstance(obj, list):
+        if len(obj) > max_list:
+            truncated.append(path)
+        trimmed_list = []
+        for index, value in enumerate(obj[:max_list]):
+            trimmed_value, child_truncated = _truncate_for_error(
+                value, max_str, max_list, f"{path}[{index}]"
+            )
+            trimmed_list.append(trimmed_value)
+            truncated.extend(child_truncated)
+        return trimmed_list, truncated
+
+    return obj, truncated
+
+
+def _generate_remediation_hints(
+    error: Exception, errors_list: list[Any] | None = None
+) -> list[str]:
+    """Generate hints for AI agents to remediate the error.
+
+    Analyzes the error type and message to suggest specific
+    remediation actions.
+
+    Args:
+        error: The exception that caused the failure
+        errors_list: Already-computed error.errors() for a ValidationError
+            (avoids serializing the error tree a second time)
+    """
+    hints = []
+
+    if isinstance(error, ValidationError):
+        if errors_list is None:
+            errors_list = error.errors()
+
+        for err in errors_list:
+            field = ".".join(map(str, err["loc"]))
+            error_type = err["type"]
+
+            for tokens, template in _HINT_RULES:
+                if any(token in error_type for token in tokens):
+                    hints.append(template.format(field=field))
+                    break
+
+    if not hints:
+        hints.append("Manual review required - error pattern not recognized.")
+
+    return hints
+
+
+def _generate_error_filename(source_file: str, invoice_id: str) -> str:
+    """Generate error filename from source file or invoice ID.
+
+    Examples:
+        - gs://bucket/landing/ubereats_INV-UE-123.tiff
+          → ubereats_INV-UE-123.error.json
+
+        - unknown source with invoice_id INV-GH-456
+          → INV-GH-456.error.json
+    """
+    if source_file and source_file != "unknown":
+        file_name = source_file.rpartition("/")[2]
+        base_name = file_name.rpartition(".")[0] or file_name
+        base_name = _PAGE_SUFFIX_RE.sub("", base_name)
+        return f"{base_name}.error.json"
+
+    if invoice_id and invoice_id != "unknown":
+        return f"{invoice_id}.error.json"
+
+    timestamp = time.strftime("%Y%m%d_%H%M%S", time.gmtime())
+    return f"unknown_{timestamp}.error.json"
@@ -0,0 +1,120 @@
+"""Message processing shared by the BigQuery writer entry points.
+
+Holds the cached GCP adapters, the message/invoice validators and the
+invoice loading used by both the push handler (main) and the
+streaming-pull subscriber, so neither entry point imports the other.
+"""
+
+import logging
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any
+
+from google.api_core.exceptions import InternalServerError, ServiceUnavailable
+from pydantic import TypeAdapter
+
+from shared.adapters import GCPBigQueryAdapter, GCSAdapter
+from shared.schemas.invoice import ExtractedInvoice, LineItem, VendorType
+from shared.schemas.messages import InvoiceExtractedMessage
+
+logger = logging.getLogger(__name__)
+
+# Validators built once at import and shared by the push handler and subscriber
+MSG_VALIDATOR = TypeAdapter(InvoiceExtractedMessage)
+INV_VALIDATOR = TypeAdapter(ExtractedInvoice)
+
+# gRPC UNAVAILABLE / INTERNAL: the cached clients may hold a dead connection
+_RECONNECT_ERRORS = (ServiceUnavailable, InternalServerError)
+
+
+@lru_cache(maxsize=1)
+def get_bq_adapter(project_id: str) -> GCPBigQueryAdapter:
+    """BigQuery adapter shared by every invocation on a warm instance.
+
+    Note:
+        Clear with get_bq_adapter.cache_clear() to force a reconnect.
+    """
+    return GCPBigQueryAdapter(project_id=project_id)
+
+
+@lru_cache(maxsize=1)
+def get_gcs_adapter(project_id: str) -> GCSAdapter:
+    """GCS adapter shared by every invocation on a warm instance.
+
+    Note:
+        Clear with get_gcs_adapter.cache_clear() to force a reconnect.
+    """
+    return GCSAdapter(project_id=project_id)
+
+
+def reset_adapters_on_connection_error(error: BaseException) -> None:
+    """Drop cached adapters after a connection-level failure.
+
+    The next invocation rebuilds the clients (and their gRPC channels)
+    instead of reusing a broken connection. The error's __cause__ is
+    checked too, since write failures are re-raised as RuntimeError.
+    """
+    cause = error if isinstance(error, _RECONNECT_ERRORS) else error.__cause__
+    if isinstance(cause, _RECONNECT_ERRORS):
+        logger.warning(
+            "Resetting cached GCP adapters after connection error",
+            extra={"error_type": type(cause).__name__},
+        )
+        get_bq_adapter.cache_clear()
+        get_gcs_adapter.cache_clear()
+
+
+def load_invoice(config: Any, extracted_data: dict[str, Any]) -> ExtractedInvoice:
+    """Build the ExtractedInvoice for an extracted-data payload.
+
+    With config.trust_upstream the payload is rebuilt via model_construct,
+    skipping the validator tree the extractor already ran. If the payload
+    does not have the expected shape, full validation runs instead so the
+    failure carries a proper ValidationError.
+    """
+    if config.trust_upstream:
+        try:
+            return _construct_trusted_invoice(extracted_data)
+        except (KeyError, TypeError, ValueError, ArithmeticError):
+            pass
+
+    return INV_VALIDATOR.validate_python(extracted_data)
+
+
+def _construct_trusted_invoice(data: dict[str, Any]) -> ExtractedInvoice:
+    """Rebuild an ExtractedInvoice from upstream JSON without validation.
+
+    Only converts JSON scalars back to the types the row builders use
+    (enum, date, int, Decimal); constraints and model validators are
+    skipped. Conversion errors are raised here, inside load_invoice's
+    fallback, rather than later in the row builders.
+    """
+    return ExtractedInvoice.model_construct(
+        invoice_id=data["invoice_id"],
+        vendor_name=data["vendor_name"],
+        vendor_type=VendorType(data.get("vendor_type", VendorType.OTHER)),
+        invoice_date=date.fromisoformat(data["invoice_date"]),
+        due_date=date.fromisoformat(data["due_date"]),
+        currency=data.get("currency", "USD"),
+        line_items=[
+            LineItem.model_construct(
+                description=item["description"],
+                quantity=int(item.get("quantity", 1)),
+                unit_price=_to_decimal(item["unit_price"]),
+            )
+            for item in data.get("line_items", [])
+        ],
+        subtotal=_to_decimal(data["subtotal"]),
+        tax_amount=_to_decimal(data.get("tax_amount")),
+        commission_rate=_to_decimal(data.get("commission_rate")),
+        commission_amount=_to_decimal(data.get("commission_amount")),
+        total_amount=_to_decimal(data["total_amount"]),
+    )
+
+
+def _to_decimal(value: Any) -> Decimal:
+    """Convert a JSON number/string to Decimal (None becomes 0, as in the schema)."""
+    if value is None:
+        return Decimal("0")
+    return Decimal(str(value))
@@ -0,0 +1,207 @@
+"""Streaming-pull entry point for BigQuery writer.
+
+Long-running alternative to the per-event Cloud Run function: pulls from
+the invoice-extracted subscription, validates each message, buffers the
+prepared rows, and flushes them to BigQuery in bulk (one insert per
+table per batch instead of per invoice).
+
+Run on an always-on Cloud Run worker pool (see
+deploy/bigquery_writer_subscriber.Dockerfile), pulling from the
+subscription created by scripts/setup-triggers.sh with
+BIGQUERY_WRITER_MODE=pull:
+    python -m functions.bigquery_writer.subscriber
+
+Failed messages are handled like the push handler: a structured error
+file is written to the failed bucket and the message is acked. Since this
+process is always on, the upload is queued on a background thread
+instead of blocking the callback, and the message is acked once the
+error file is written.
+"""
+
+import logging
+import signal
+from functools import partial
+from typing import Any
+
+import orjson
+from pydantic import ValidationError
+
+from shared.schemas.messages import InvoiceExtractedMessage
+from shared.utils import Config, configure_logging, get_config
+
+from .batcher import InvoiceBatcher
+from .failures import drain_failure_queue, record_failure
+from .processing import (
+    MSG_VALIDATOR,
+    get_bq_adapter,
+    load_invoice,
+    reset_adapters_on_connection_error,
+)
+from .writer import (
+    BatchWriteResult,
+    PreparedInvoice,
+    prepare_invoice,
+    write_invoice_batch,
+)
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """Pull invoice-extracted messages and write them to BigQuery in batches.
+
+    Blocks until the streaming pull is cancelled (Ctrl+C or SIGTERM) or
+    fails, then flushes whatever is still buffered and uploads queued
+    error files.
+    """
+    from google.cloud import pubsub_v1
+
+    config = get_config()
+
+    batcher = InvoiceBatcher(
+        flush=partial(_flush_batch, config=config),
+        batch_size=config.bq_batch_size,
+        max_wait_ms=config.bq_batch_max_wait_ms,
+    )
+
+    subscriber = pubsub_v1.SubscriberClient()
+    subscription_path = subscriber.subscription_path(
+        config.project_id, config.extracted_subscription
+    )
+    flow_control = pubsub_v1.types.FlowControl(max_messages=config.bq_batch_size * 2)
+
+    streaming_pull = subscriber.subscribe(
+        subscription_path,
+        callback=partial(_handle_message, config=config, batcher=batcher),
+        flow_control=flow_control,
+    )
+
+    logger.info(
+        "BigQuery writer subscriber started",
+        extra={
+            "subscription": subscription_path,
+            "batch_size": config.bq_batch_size,
+            "max_wait_ms": config.bq_batch_max_wait_ms,
+        },
+    )
+
+    # Cloud Run sends SIGTERM before stopping the instance; the default
+    # handler exits without running finally blocks or atexit hooks
+    signal.signal(signal.SIGTERM, lambda signum, frame: streaming_pull.cancel())
+
+    with subscriber:
+        try:
+            streaming_pull.result()
+        except KeyboardInterrupt:
+            streaming_pull.cancel()
+            streaming_pull.result()
+        finally:
+            batcher.close()
+            drain_failure_queue()
+
+
+def _flush_batch(batch: list[PreparedInvoice], *, config: Config) -> BatchWriteResult:
+    """Write one batch with the cached adapter, resetting it on connection errors."""
+    try:
+        return write_invoice_batch(
+            batch,
+            bq_adapter=get_bq_adapter(config.project_id),
+            dataset=config.dataset,
+            invoices_table=config.invoices_table,
+            line_items_table=config.line_items_table,
+            metrics_table=config.metrics_table,
+        )
+    except Exception as e:
+        reset_adapters_on_connection_error(e)
+        raise
+
+
+def _handle_message(
+    pubsub_message: Any,
+    *,
+    config: Config,
+    batcher: InvoiceBatcher,
+) -> None:
+    """Validate one pulled message and hand its rows to the batcher.
+
+    The message is acked by the batcher once its batch is persisted.
+    Messages that fail before reaching the batcher are recorded in the
+    failed bucket and acked once the error file is written, so a bad
+    message is never redelivered in a loop. If the failure cannot even be
+    queued, the message is acked here.
+    """
+    source_file = "unknown"
+    invoice_id = "unknown"
+    message: InvoiceExtractedMessage | None = None
+    raw_message: dict[str, Any] = {}
+
+    try:
+        raw_message = orjson.loads(pubsub_message.data)
+
+        message = MSG_VALIDATOR.validate_python(raw_message)
+        source_file = message.source_file
+
+        invoice = load_invoice(config, message.extracted_data)
+        invoice_id = invoice.invoice_id
+
+        prepared = prepare_invoice(
+            invoice,
+            source_file=source_file,
+            extraction_model=message.extraction_model,
+            extraction_latency_ms=message.extraction_latency_ms,
+            confidence_score=message.confidence_score,
+        )
+
+    except (ValidationError, orjson.JSONDecodeError) as e:
+        logger.warning(
+            "Invalid extracted invoice message",
+            extra={
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "source_file": source_file,
+                "invoice_id": invoice_id,
+            },
+        )
+        error = e
+
+    except Exception as e:
+        logger.exception(
+            "Extracted invoice message processing failed",
+            extra={
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "source_file": source_file,
+                "invoice_id": invoice_id,
+            },
+        )
+        reset_adapters_on_connection_error(e)
+        error = e
+
+    else:
+        batcher.add(prepared, ack=pubsub_message.ack, nack=pubsub_message.nack)
+        return
+
+    queued = False
+    try:
+        queued = (
+            record_failure(
+                config=config,
+                bq_adapter=get_bq_adapter(config.project_id),
+                source_file=source_file,
+                invoice_id=invoice_id,
+                error=error,
+                raw_message=raw_message,
+                message=message,
+                ack=pubsub_message.ack,
+                nack=pubsub_message.nack,
+            )
+            is not None
+        )
+    finally:
+        if not queued:
+            pubsub_message.ack()
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,7 @@ class WriteResult:
         is_duplicate: Whether invoice was already in BigQuery
         rows_written: Number of rows written (invoice + line items)
         error: Error message if failed
+        exception: Original exception if failed (lets callers react to its type)
     """
 
     success: bool
@@ -32,6 +33,39 @@ class WriteResult:
     is_duplicate: bool
     rows_written: int
     error: str | None = None
+    exception: Exception | None = None
+
+
+@dataclass
+class PreparedInvoice:
+    """Invoice rows prepared for a bulk BigQuery flush.
+
+    Attributes:
+        invoice_id: Invoice ID (used for batch deduplication)
+        invoice_row: Row for the invoices table
+        line_item_rows: Rows for the line items table
+        metrics_row: Row for the extraction metrics table
+    """
+
+    invoice_id: str
+    invoice_row: dict
+    line_item_rows: list[dict]
+    metrics_row: dict
+
+
+@dataclass
+class BatchWriteResult:
+    """Result of a bulk BigQuery flush.
+
+    Attributes:
+        invoices_written: Number of new invoices written
+        duplicates: Number of invoices skipped as duplicates
+        rows_written: Number of rows written (invoices + line items)
+    """
+
+    invoices_written: int
+    duplicates: int
+    rows_written: int
 
 
 def write_invoice_to_bigquery(
@@ -45,12 +79,18 @@ def write_invoice_to_bigquery(
     extraction_model: str | None = None,
     extraction_latency_ms: int | None = None,
     confidence_score: float | None = None,
+    metrics_table: str | None = None,
 ) -> WriteResult:
     """Write extracted invoice to BigQuery.
 
     Performs duplicate check, writes invoice and line items,
     and logs metrics. Returns result with status details.
 
+    When metrics_table is given, the success metrics row is written in
+    the same adapter call as the invoice and line items. Line items are
+    always committed before the invoice row, and a failed metrics write
+    does not fail the invoice write.
+
     Args:
         invoice: Validated ExtractedInvoice to persist
         bq_adapter: BigQuery adapter for database operations
@@ -61,6 +101,7 @@ def write_invoice_to_bigquery(
         extraction_model: LLM model used (for metrics)
         extraction_latency_ms: Extraction latency (for metrics)
         confidence_score: Extraction confidence (for metrics)
+        metrics_table: Table name for extraction metrics (fuses the metrics write)
 
     Returns:
         WriteResult with operation status
@@ -74,6 +115,19 @@ def write_invoice_to_bigquery(
                     "vendor_type": invoice.vendor_type.value,
                 },
             )
+            if metrics_table:
+                write_extraction_metrics(
+                    bq_adapter,
+                    dataset,
+                    metrics_table,
+                    invoice_id=invoice.invoice_id,
+                    vendor_type=invoice.vendor_type,
+                    source_file=source_file,
+                    extraction_model=extraction_model,
+                    extraction_latency_ms=extraction_latency_ms,
+                    confidence_score=confidence_score,
+                    success=True,
+                )
             return WriteResult(
                 success=True,
                 invoice_id=invoice.invoice_id,
@@ -88,12 +142,33 @@ def write_invoice_to_bigquery(
             extraction_latency_ms=extraction_latency_ms,
             confidence_score=confidence_score,
         )
-
-        bq_adapter.write_invoice_row(dataset, invoices_table, invoice_row)
-
         line_item_rows = _prepare_line_item_rows(invoice)
-        if line_item_rows:
-            bq_adapter.write_line_item_rows(dataset, line_items_table, line_item_rows)
+
+        if metrics_table:
+            bq_adapter.write_rows_multi(
+                dataset,
+                invoices_table=invoices_table,
+                invoice_rows=[invoice_row],
+                line_items_table=line_items_table,
+                line_item_rows=line_item_rows,
+                metrics_table=metrics_table,
+                metrics_rows=[
+                    _prepare_metrics_row(
+                        invoice_id=invoice.invoice_id,
+                        vendor_type=invoice.vendor_type,
+                        source_file=source_file,
+                        extraction_model=extraction_model,
+                        extraction_latency_ms=extraction_latency_ms,
+                        confidence_score=confidence_score,
+                        success=True,
+                    )
+                ],
+            )
+        else:
+            # Invoice row last: it is the marker the duplicate check looks for
+            if line_item_rows:
+                bq_adapter.write_line_item_rows(dataset, line_items_table, line_item_rows)
+            bq_adapter.write_invoice_row(dataset, invoices_table, invoice_row)
 
         total_rows = 1 + len(line_item_rows)
 
@@ -128,6 +203,7 @@ def write_invoice_to_bigquery(
             is_duplicate=False,
             rows_written=0,
             error=str(e),
+            exception=e,
         )
 
 
@@ -242,19 +318,16 @@ def write_extraction_metrics(
         True if metrics written successfully
     """
     try:
-        now = datetime.now(timezone.utc)
-
-        metrics_row = {
-            "invoice_id": invoice_id,
-            "vendor_type": vendor_type.value,
-            "source_file": source_file,
-            "extraction_model": extraction_model,
-            "extraction_latency_ms": extraction_latency_ms,
-            "confidence_score": confidence_score,
-            "success": success,
-            "error_message": error_message,
-            "created_at": now.isoformat(),
-        }
+        metrics_row = _prepare_metrics_row(
+            invoice_id=invoice_id,
+            vendor_type=vendor_type,
+            source_file=source_file,
+            extraction_model=extraction_model,
+            extraction_latency_ms=extraction_latency_ms,
+            confidence_score=confidence_score,
+            success=success,
+            error_message=error_message,
+        )
 
         bq_adapter.write_metrics(dataset, metrics_table, metrics_row)
 
@@ -277,3 +350,163 @@ def write_extraction_metrics(
             },
         )
         return False
+
+
+def _prepare_metrics_row(
+    *,
+    invoice_id: str,
+    vendor_type: VendorType,
+    source_file: str,
+    extraction_model: str,
+    extraction_latency_ms: int,
+    confidence_score: float,
+    success: bool,
+    error_message: str | None = None,
+) -> dict:
+    """Prepare extraction metrics row for BigQuery insert.
+
+    Returns:
+        Dict ready for BigQuery insert
+    """
+    now = datetime.now(timezone.utc)
+
+    return {
+        "invoice_id": invoice_id,
+        "vendor_type": vendor_type.value,
+        "source_file": source_file,
+        "extraction_model": extraction_model,
+        "extraction_latency_ms": extraction_latency_ms,
+        "confidence_score": confidence_score,
+        "success": success,
+        "error_message": error_message,
+        "created_at": now.isoformat(),
+    }
+
+
+def prepare_invoice(
+    invoice: ExtractedInvoice,
+    *,
+    source_file: str,
+    extraction_model: str,
+    extraction_latency_ms: int,
+    confidence_score: float,
+) -> PreparedInvoice:
+    """Prepare all BigQuery rows for one invoice ahead of a bulk flush.
+
+    Args:
+        invoice: Validated invoice data
+        source_file: Original file URI
+        extraction_model: LLM model used
+        extraction_latency_ms: Processing time
+        confidence_score: Extraction confidence
+
+    Returns:
+        PreparedInvoice holding invoice, line item, and metrics rows
+    """
+    return PreparedInvoice(
+        invoice_id=invoice.invoice_id,
+        invoice_row=_prepare_invoice_row(
+            invoice,
+            source_file=source_file,
+            extraction_model=extraction_model,
+            extraction_latency_ms=extraction_latency_ms,
+            confidence_score=confidence_score,
+        ),
+        line_item_rows=_prepare_line_item_rows(invoice),
+        metrics_row=_prepare_metrics_row(
+            invoice_id=invoice.invoice_id,
+            vendor_type=invoice.vendor_type,
+            source_file=source_file,
+            extraction_model=extraction_model,
+            extraction_latency_ms=extraction_latency_ms,
+            confidence_score=confidence_score,
+            success=True,
+        ),
+    )
+
+
+def write_invoice_batch(
+    batch: list[PreparedInvoice],
+    bq_adapter: BigQueryAdapter,
+    dataset: str,
+    invoices_table: str,
+    line_items_table: str,
+    metrics_table: str,
+) -> BatchWriteResult:
+    """Write a batch of prepared invoices to BigQuery in bulk.
+
+    Runs one duplicate check for the whole batch, then writes all three
+    tables in a single adapter call. Invoices already in BigQuery (or
+    repeated within the batch) are skipped but still get a metrics row,
+    matching the single-invoice path.
+
+    Line items are committed before their invoice row, so a batch retried
+    after a failed invoice append may already have line items for some
+    new invoices. A second check against the line items table skips
+    those rows instead of appending them twice.
+
+    Args:
+        batch: Prepared invoices to persist
+        bq_adapter: BigQuery adapter for database operations
+        dataset: BigQuery dataset name
+        invoices_table: Table name for invoices
+        line_items_table: Table name for line items
+        metrics_table: Table name for extraction metrics
+
+    Returns:
+        BatchWriteResult with write counts
+
+    Raises:
+        Exception: Propagated from the adapter so the caller can nack the batch
+    """
+    if not batch:
+        return BatchWriteResult(invoices_written=0, duplicates=0, rows_written=0)
+
+    seen = bq_adapter.existing_invoice_ids(
+        dataset, invoices_table, list({item.invoice_id for item in batch})
+    )
+
+    new_items: list[PreparedInvoice] = []
+    duplicates = 0
+
+    for item in batch:
+        if item.invoice_id in seen:
+            duplicates += 1
+            continue
+        seen.add(item.invoice_id)
+        new_items.append(item)
+
+    has_line_items = bq_adapter.existing_invoice_ids(
+        dataset, line_items_table, [item.invoice_id for item in new_items]
+    )
+
+    invoice_rows = [item.invoice_row for item in new_items]
+    line_item_rows = [
+        row
+        for item in new_items
+        if item.invoice_id not in has_line_items
+        for row in item.line_item_rows
+    ]
+    metrics_rows = [item.metrics_row for item in batch]
+
+    bq_adapter.write_rows_multi(
+        dataset,
+        invoices_table=invoices_table,
+        invoice_rows=invoice_rows,
+        line_items_table=line_items_table,
+        line_item_rows=line_item_rows,
+        metrics_table=metrics_table,
+        metrics_rows=metrics_rows,
+    )
+
+    if duplicates:
+        logger.warning(
+            "Duplicate invoices skipped in batch",
+            extra={"duplicates": duplicates, "batch_size": len(batch)},
+        )
+
+    return BatchWriteResult(
+        invoices_written=len(invoice_rows),
+        duplicates=duplicates,
+        rows_written=len(invoice_rows) + len(line_item_rows),
+    )
@@ -7,6 +7,7 @@ These adapters enable:
 """
 
 from shared.adapters.bigquery import BigQueryAdapter, GCPBigQueryAdapter
+from shared.adapters.cache import CacheAdapter, RedisCacheAdapter
 from shared.adapters.llm import GeminiAdapter, LLMAdapter, LLMResponse, OpenRouterAdapter
 from shared.adapters.messaging import MessagingAdapter, PubSubAdapter
 from shared.adapters.observability import (
@@ -29,6 +30,8 @@ __all__ = [
     "LLMResponse",
     "BigQueryAdapter",
     "GCPBigQueryAdapter",
+    "CacheAdapter",
+    "RedisCacheAdapter",
     "LangfuseObserver",
     "GenerationContext",
     "TraceContext",
@@ -1,12 +1,25 @@
 """BigQuery adapter with Protocol interface and GCP implementation.
 
 Handles writing extracted invoice data to BigQuery tables.
+
+Prepared rows are written through the BigQuery Storage Write API
+(default stream, proto-serialized rows) rather than the legacy
+``tabledata.insertAll`` JSON path.
 """
 
+import contextlib
+import logging
+import threading
+from concurrent.futures import Future
 from typing import Any, Protocol
 
 from shared.schemas.invoice import ExtractedInvoice
 
+logger = logging.getLogger(__name__)
+
+# (table key, future or job with .result(), row count) for one in-flight write
+_PendingWrite = tuple[str, Any, int]
+
 
 class BigQueryAdapter(Protocol):
     """Protocol for BigQuery operations."""
@@ -56,16 +69,21 @@ class BigQueryAdapter(Protocol):
 class GCPBigQueryAdapter:
     """Google BigQuery implementation."""
 
-    def __init__(self, project_id: str | None = None):
+    def __init__(self, project_id: str | None = None, load_job_threshold: int = 10_000):
         """Initialize BigQuery client.
 
         Args:
             project_id: GCP project ID (uses ADC default if None)
+            load_job_threshold: Row count above which write_rows_multi uses load jobs
         """
         from google.cloud import bigquery
 
         self._client = bigquery.Client(project=project_id)
         self._project_id = project_id or self._client.project
+        self._load_job_threshold = load_job_threshold
+        self._write_client = None
+        self._append_streams: dict[str, Any] = {}
+        self._append_streams_lock = threading.Lock()
 
     def write_invoice(
         self, dataset: str, table: str, invoice: ExtractedInvoice, metadata: dict[str, Any]
@@ -165,11 +183,9 @@ class GCPBigQueryAdapter:
         Returns:
             Invoice ID from row
         """
-        table_id = f"{self._project_id}.{dataset}.{table}"
+        from shared.adapters.bigquery_rows import InvoiceRow, to_proto_rows
 
-        errors = self._client.insert_rows_json(table_id, [row])
-        if errors:
-            raise RuntimeError(f"BigQuery insert errors: {errors}")
+        self.append_rows(dataset, table, to_proto_rows(InvoiceRow, [row]))
 
         return row.get("invoice_id", "")
 
@@ -184,16 +200,9 @@ class GCPBigQueryAdapter:
         Returns:
             Number of rows inserted
         """
-        if not rows:
-            return 0
-
-        table_id = f"{self._project_id}.{dataset}.{table}"
+        from shared.adapters.bigquery_rows import LineItemRow, to_proto_rows
 
-        errors = self._client.insert_rows_json(table_id, rows)
-        if errors:
-            raise RuntimeError(f"BigQuery insert errors: {errors}")
-
-        return len(rows)
+        return self.append_rows(dataset, table, to_proto_rows(LineItemRow, rows))
 
     def write_metrics(self, dataset: str, table: str, row: dict) -> None:
         """Write extraction metrics to BigQuery.
@@ -203,8 +212,240 @@ class GCPBigQueryAdapter:
             table: Metrics table name
             row: Metrics row dict
         """
+        from shared.adapters.bigquery_rows import MetricsRow, to_proto_rows
+
+        self.append_rows(dataset, table, to_proto_rows(MetricsRow, [row]))
+
+    def existing_invoice_ids(self, dataset: str, table: str, invoice_ids: list[str]) -> set[str]:
+        """Return the subset of invoice IDs already present (batch deduplication).
+
+        Works on any table with an invoice_id column, e.g. the invoices
+        table for duplicates or the line items table for rows left by a
+        partially written batch.
+
+        Args:
+            dataset: BigQuery dataset name
+            table: Table name
+            invoice_ids: Invoice IDs to check
+
+        Returns:
+            Set of invoice IDs that already exist
+        """
+        if not invoice_ids:
+            return set()
+
+        query = f"""
+            SELECT DISTINCT invoice_id
+            FROM `{self._project_id}.{dataset}.{table}`
+            WHERE invoice_id IN UNNEST(@invoice_ids)
+        """
+
+        from google.cloud.bigquery import ArrayQueryParameter, QueryJobConfig
+
+        job_config = QueryJobConfig(
+            query_parameters=[ArrayQueryParameter("invoice_ids", "STRING", invoice_ids)]
+        )
+
+        result = self._client.query(query, job_config=job_config).result()
+        return {row.invoice_id for row in result}
+
+    def write_rows_multi(
+        self,
+        dataset: str,
+        *,
+        invoices_table: str,
+        invoice_rows: list[dict],
+        line_items_table: str,
+        line_item_rows: list[dict],
+        metrics_table: str,
+        metrics_rows: list[dict],
+    ) -> int:
+        """Write invoice, line item and metrics rows in one call.
+
+        Each table's default stream commits on its own, so the writes are
+        ordered to keep redelivery safe: line item and metrics rows are sent
+        together and awaited first, and invoice rows are written last. The
+        invoice row is what duplicate checks look for, so it acts as the
+        commit marker - if anything fails before it lands, a retry finds no
+        invoice and writes everything again.
+
+        Metrics are best effort: a failed metrics write is logged and does
+        not fail the call. Batches larger than the load-job threshold are
+        written with load jobs (in the same order) instead of streaming.
+
+        Args:
+            dataset: BigQuery dataset name
+            invoices_table: Table name for invoices
+            invoice_rows: Prepared invoice row dicts
+            line_items_table: Table name for line items
+            line_item_rows: Prepared line item row dicts
+            metrics_table: Table name for extraction metrics
+            metrics_rows: Prepared metrics row dicts
+
+        Returns:
+            Total number of rows written
+        """
+        row_count = len(invoice_rows) + len(line_item_rows) + len(metrics_rows)
+
+        if row_count > self._load_job_threshold:
+            send, wait = self._start_load_job, self._wait_load_job
+        else:
+            from shared.adapters.bigquery_rows import (
+                InvoiceRow,
+                LineItemRow,
+                MetricsRow,
+                to_proto_rows,
+            )
+
+            invoice_rows = to_proto_rows(InvoiceRow, invoice_rows)
+            line_item_rows = to_proto_rows(LineItemRow, line_item_rows)
+            metrics_rows = to_proto_rows(MetricsRow, metrics_rows)
+            send, wait = self._send_append, self._wait_append
+
+        pending_line_items = send(dataset, line_items_table, line_item_rows)
+        pending_metrics = send(dataset, metrics_table, metrics_rows)
+
+        written = wait(pending_line_items)
+
+        try:
+            written += wait(pending_metrics)
+        except Exception as e:
+            logger.warning(
+                "Metrics write failed - continuing",
+                extra={"table": metrics_table, "error": str(e)},
+            )
+
+        return written + wait(send(dataset, invoices_table, invoice_rows))
+
+    def append_rows(self, dataset: str, table: str, rows: list[Any]) -> int:
+        """Append proto rows to a table via the Storage Write API.
+
+        Rows go to the table's default stream, so they are committed as
+        soon as the append succeeds. The stream (and its gRPC connection)
+        is opened on first use and reused for the life of the adapter.
+
+        Args:
+            dataset: BigQuery dataset name
+            table: Table name
+            rows: Proto messages from shared.adapters.bigquery_rows
+
+        Returns:
+            Number of rows appended
+        """
+        return self._wait_append(self._send_append(dataset, table, rows))
+
+    def _send_append(self, dataset: str, table: str, rows: list[Any]) -> _PendingWrite | None:
+        """Send an append without waiting for it.
+
+        A send failure is returned on the future, so callers handle every
+        failure in one place when they wait.
+        """
+        if not rows:
+            return None
+
+        from google.cloud.bigquery_storage_v1 import types
+
+        request = types.AppendRowsRequest(
+            proto_rows=types.AppendRowsRequest.ProtoData(
+                rows=types.ProtoRows(serialized_rows=[row.SerializeToString() for row in rows])
+            )
+        )
+
+        stream_key = f"{dataset}.{table}"
+
+        try:
+            stream = self._get_append_stream(dataset, table, rows[0].DESCRIPTOR)
+            future = stream.send(request)
+        except Exception as e:
+            self._close_append_stream(stream_key)
+            future = Future()
+            future.set_exception(e)
+
+        return stream_key, future, len(rows)
+
+    def _wait_append(self, pending: _PendingWrite | None) -> int:
+        """Wait for a sent append and return the number of rows it wrote."""
+        if pending is None:
+            return 0
+
+        stream_key, future, row_count = pending
+
+        try:
+            response = future.result()
+        except Exception:
+            self._close_append_stream(stream_key)
+            raise
+
+        if response.row_errors:
+            raise RuntimeError(
+                f"BigQuery append errors ({stream_key}): {list(response.row_errors)}"
+            )
+
+        return row_count
+
+    def _start_load_job(self, dataset: str, table: str, rows: list[dict]) -> _PendingWrite | None:
+        """Start a load job for row dicts without waiting for it."""
+        if not rows:
+            return None
+
+        from google.cloud.bigquery import LoadJobConfig, WriteDisposition
+
         table_id = f"{self._project_id}.{dataset}.{table}"
+        job_config = LoadJobConfig(write_disposition=WriteDisposition.WRITE_APPEND)
 
-        errors = self._client.insert_rows_json(table_id, [row])
-        if errors:
-            raise RuntimeError(f"BigQuery metrics insert errors: {errors}")
+        try:
+            job = self._client.load_table_from_json(rows, table_id, job_config=job_config)
+        except Exception as e:
+            job = Future()
+            job.set_exception(e)
+
+        return table_id, job, len(rows)
+
+    def _wait_load_job(self, pending: _PendingWrite | None) -> int:
+        """Wait for a load job and return the number of rows it wrote."""
+        if pending is None:
+            return 0
+
+        _, job, row_count = pending
+        job.result()
+        return row_count
+
+    def _get_append_stream(self, dataset: str, table: str, descriptor: Any) -> Any:
+        """Return the cached default-stream writer for a table, opening it if needed."""
+        stream_key = f"{dataset}.{table}"
+
+        with self._append_streams_lock:
+            stream = self._append_streams.get(stream_key)
+            if stream is not None:
+                return stream
+
+            from google.cloud import bigquery_storage_v1
+            from google.cloud.bigquery_storage_v1 import types, writer
+            from google.protobuf import descriptor_pb2
+
+            if self._write_client is None:
+                self._write_client = bigquery_storage_v1.BigQueryWriteClient()
+
+            proto_descriptor = descriptor_pb2.DescriptorProto()
+            descriptor.CopyToProto(proto_descriptor)
+
+            table_path = self._write_client.table_path(self._project_id, dataset, table)
+            template = types.AppendRowsRequest(
+                write_stream=f"{table_path}/streams/_default",
+                proto_rows=types.AppendRowsRequest.ProtoData(
+                    writer_schema=types.ProtoSchema(proto_descriptor=proto_descriptor)
+                ),
+            )
+
+            stream = writer.AppendRowsStream(self._write_client, template)
+            self._append_streams[stream_key] = stream
+            return stream
+
+    def _close_append_stream(self, stream_key: str) -> None:
+        """Drop a cached stream so the next append opens a fresh connection."""
+        with self._append_streams_lock:
+            stream = self._append_streams.pop(stream_key, None)
+
+        if stream is not None:
+            with contextlib.suppress(Exception):
+                stream.close()
@@ -0,0 +1,162 @@
+"""Protobuf row types for the BigQuery Storage Write API.
+
+The Storage Write API takes rows as serialized protocol buffers plus the
+descriptor that describes them. The descriptors are built once at import
+time from the table schemas below (which mirror scripts/setup-infra.sh),
+so no protoc-generated module has to be kept in sync with the tables.
+
+Proto types follow the Storage Write API type mapping:
+- DATE: int32 days since the Unix epoch
+- TIMESTAMP: int64 microseconds since the Unix epoch
+"""
+
+from collections.abc import Callable
+from datetime import date, datetime, timezone
+from typing import Any
+
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+from google.protobuf.message import Message
+
+_FieldType = descriptor_pb2.FieldDescriptorProto
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_MICROSECOND = datetime.resolution
+
+
+def _date_to_days(value: Any) -> int:
+    """Convert a date (or ISO date string) to days since epoch."""
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+def _timestamp_to_micros(value: Any) -> int:
+    """Convert a datetime (or ISO timestamp string) to microseconds since epoch."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+# BigQuery column type -> (proto field type, value converter)
+_COLUMN_TYPES: dict[str, tuple[int, Callable[[Any], Any]]] = {
+    "STRING": (_FieldType.TYPE_STRING, str),
+    "INTEGER": (_FieldType.TYPE_INT64, int),
+    "FLOAT": (_FieldType.TYPE_DOUBLE, float),
+    "BOOLEAN": (_FieldType.TYPE_BOOL, bool),
+    "DATE": (_FieldType.TYPE_INT32, _date_to_days),
+    "TIMESTAMP": (_FieldType.TYPE_INT64, _timestamp_to_micros),
+}
+
+_TABLE_SCHEMAS: dict[str, list[tuple[str, str]]] = {
+    "InvoiceRow": [
+        ("invoice_id", "STRING"),
+        ("vendor_name", "STRING"),
+        ("vendor_type", "STRING"),
+        ("invoice_date", "DATE"),
+        ("due_date", "DATE"),
+        ("currency", "STRING"),
+        ("subtotal", "FLOAT"),
+        ("tax_amount", "FLOAT"),
+        ("commission_rate", "FLOAT"),
+        ("commission_amount", "FLOAT"),
+        ("total_amount", "FLOAT"),
+        ("line_items_count", "INTEGER"),
+        ("source_file", "STRING"),
+        ("extraction_model", "STRING"),
+        ("extraction_latency_ms", "INTEGER"),
+        ("confidence_score", "FLOAT"),
+        ("created_at", "TIMESTAMP"),
+        ("updated_at", "TIMESTAMP"),
+    ],
+    "LineItemRow": [
+        ("invoice_id", "STRING"),
+        ("line_number", "INTEGER"),
+        ("description", "STRING"),
+        ("quantity", "INTEGER"),
+        ("unit_price", "FLOAT"),
+        ("amount", "FLOAT"),
+        ("created_at", "TIMESTAMP"),
+    ],
+    "MetricsRow": [
+        ("invoice_id", "STRING"),
+        ("vendor_type", "STRING"),
+        ("source_file", "STRING"),
+        ("extraction_model", "STRING"),
+        ("extraction_latency_ms", "INTEGER"),
+        ("confidence_score", "FLOAT"),
+        ("success", "BOOLEAN"),
+        ("error_message", "STRING"),
+        ("created_at", "TIMESTAMP"),
+    ],
+}
+
+
+def _build_row_types() -> dict[str, type[Message]]:
+    """Build proto2 message classes for every table schema."""
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name="invoice_pipeline_rows.proto",
+        package="invoice_pipeline",
+        syntax="proto2",
+    )
+
+    for message_name, columns in _TABLE_SCHEMAS.items():
+        message_proto = file_proto.message_type.add(name=message_name)
+        for number, (column, column_type) in enumerate(columns, start=1):
+            message_proto.field.add(
+                name=column,
+                number=number,
+                type=_COLUMN_TYPES[column_type][0],
+                label=_FieldType.LABEL_OPTIONAL,
+            )
+
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+
+    return {
+        message_name: message_factory.GetMessageClass(
+            pool.FindMessageTypeByName(f"invoice_pipeline.{message_name}")
+        )
+        for message_name in _TABLE_SCHEMAS
+    }
+
+
+_ROW_TYPES = _build_row_types()
+
+_CONVERTERS: dict[str, list[tuple[str, Callable[[Any], Any]]]] = {
+    message_name: [(column, _COLUMN_TYPES[column_type][1]) for column, column_type in columns]
+    for message_name, columns in _TABLE_SCHEMAS.items()
+}
+
+InvoiceRow = _ROW_TYPES["InvoiceRow"]
+LineItemRow = _ROW_TYPES["LineItemRow"]
+MetricsRow = _ROW_TYPES["MetricsRow"]
+
+
+def to_proto_rows(row_type: type[Message], rows: list[dict]) -> list[Message]:
+    """Convert prepared row dicts into proto messages of the given row type.
+
+    Keys missing from a row or set to None are left unset (NULL in BigQuery);
+    keys not in the table schema are ignored.
+
+    Args:
+        row_type: InvoiceRow, LineItemRow or MetricsRow
+        rows: Prepared row dicts
+
+    Returns:
+        List of populated proto messages
+    """
+    converters = _CONVERTERS[row_type.DESCRIPTOR.name]
+    messages = []
+
+    for row in rows:
+        message = row_type()
+        for column, convert in converters:
+            value = row.get(column)
+            if value is not None:
+                setattr(message, column, convert(value))
+        messages.append(message)
+
+    return messages
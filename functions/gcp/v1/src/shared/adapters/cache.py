@@ -0,0 +1,65 @@
+"""Cache adapter with Protocol interface and Redis implementation.
+
+Used as a fast pre-check in front of more expensive work (e.g. skipping
+re-validation and BigQuery writes for invoices already persisted).
+Backed by Memorystore for Redis in GCP.
+"""
+
+from typing import Protocol
+
+
+class CacheAdapter(Protocol):
+    """Protocol for key/value cache operations."""
+
+    def get(self, key: str) -> bytes | None:
+        """Get cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        ...
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        """Set cached value with expiry.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl_seconds: Time to live in seconds
+        """
+        ...
+
+
+class RedisCacheAdapter:
+    """Redis / Memorystore implementation."""
+
+    def __init__(self, host: str, port: int = 6379, timeout_seconds: float = 0.5):
+        """Initialize Redis client.
+
+        The client keeps a connection pool, so one instance should be
+        shared across invocations.
+
+        Args:
+            host: Redis host (Memorystore private IP)
+            port: Redis port
+            timeout_seconds: Connect/read timeout so a slow cache never stalls the caller
+        """
+        import redis
+
+        self._client = redis.Redis(
+            host=host,
+            port=port,
+            socket_timeout=timeout_seconds,
+            socket_connect_timeout=timeout_seconds,
+        )
+
+    def get(self, key: str) -> bytes | None:
+        """Get cached value from Redis."""
+        return self._client.get(key)
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        """Set cached value in Redis with SETEX."""
+        self._client.setex(key, ttl_seconds, value)
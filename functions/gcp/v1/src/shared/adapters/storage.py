@@ -6,7 +6,11 @@ The Protocol pattern enables:
 - Future portability to other cloud providers
 """
 
-from typing import Protocol
+import io
+from typing import BinaryIO, Protocol
+
+# Payloads above this size are uploaded as a chunked resumable upload
+RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024
 
 
 class StorageAdapter(Protocol):
@@ -24,14 +28,23 @@ class StorageAdapter(Protocol):
         """
         ...
 
-    def write(self, bucket: str, path: str, data: bytes, content_type: str) -> str:
+    def write(
+        self,
+        bucket: str,
+        path: str,
+        data: bytes | BinaryIO,
+        content_type: str,
+        if_generation_match: int | None = None,
+    ) -> str:
         """Write file to storage.
 
         Args:
             bucket: Bucket name
             path: File path within bucket
-            data: File contents as bytes
+            data: File contents as bytes or a binary file object
             content_type: MIME type (e.g., "image/png")
+            if_generation_match: Only write if the object's generation matches
+                (0 means only if the object does not exist yet)
 
         Returns:
             GCS URI (gs://bucket/path)
@@ -99,11 +112,38 @@ class GCSAdapter:
         blob = bucket_obj.blob(path)
         return blob.download_as_bytes()
 
-    def write(self, bucket: str, path: str, data: bytes, content_type: str) -> str:
-        """Write file to GCS."""
+    def write(
+        self,
+        bucket: str,
+        path: str,
+        data: bytes | BinaryIO,
+        content_type: str,
+        if_generation_match: int | None = None,
+    ) -> str:
+        """Write file to GCS.
+
+        Small byte payloads are sent in a single request. File objects and
+        payloads larger than RESUMABLE_CHUNK_SIZE are streamed as a chunked
+        resumable upload, so the request body is never buffered whole.
+
+        Raises:
+            google.api_core.exceptions.PreconditionFailed: If if_generation_match
+                does not match the existing object
+        """
         bucket_obj = self._client.bucket(bucket)
-        blob = bucket_obj.blob(path)
-        blob.upload_from_string(data, content_type=content_type)
+
+        if isinstance(data, bytes) and len(data) <= RESUMABLE_CHUNK_SIZE:
+            blob = bucket_obj.blob(path)
+            blob.upload_from_string(
+                data, content_type=content_type, if_generation_match=if_generation_match
+            )
+        else:
+            blob = bucket_obj.blob(path, chunk_size=RESUMABLE_CHUNK_SIZE)
+            stream = io.BytesIO(data) if isinstance(data, bytes) else data
+            blob.upload_from_file(
+                stream, content_type=content_type, if_generation_match=if_generation_match
+            )
+
         return f"gs://{bucket}/{path}"
 
     def copy(
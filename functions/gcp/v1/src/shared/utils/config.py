@@ -29,6 +29,14 @@ class Config:
         dataset: BigQuery dataset name
         invoices_table: BigQuery invoices table
         line_items_table: BigQuery line items table
+        metrics_table: BigQuery extraction metrics table
+        extracted_subscription: Pub/Sub subscription pulled by the batching writer
+        bq_batch_size: Max invoices buffered before a bulk BigQuery flush
+        bq_batch_max_wait_ms: Max time the oldest buffered invoice waits for a flush
+        redis_host: Memorystore/Redis host for the dedup cache (disabled if None)
+        redis_port: Memorystore/Redis port
+        dedup_ttl_seconds: How long written invoices are remembered in the dedup cache
+        trust_upstream: Skip re-validating extracted data already validated by the extractor
         langfuse_public_key: LangFuse public API key
         langfuse_secret_key: LangFuse secret key (from Secret Manager)
         langfuse_base_url: LangFuse server endpoint
@@ -51,6 +59,13 @@ class Config:
     invoices_table: str
     line_items_table: str
     metrics_table: str
+    extracted_subscription: str
+    bq_batch_size: int
+    bq_batch_max_wait_ms: int
+    redis_host: str | None
+    redis_port: int
+    dedup_ttl_seconds: int
+    trust_upstream: bool
     langfuse_public_key: str | None
     langfuse_secret_key: str | None
     langfuse_base_url: str
@@ -91,6 +106,15 @@ def get_config() -> Config:
         invoices_table=os.environ.get("BQ_INVOICES_TABLE", "extracted_invoices"),
         line_items_table=os.environ.get("BQ_LINE_ITEMS_TABLE", "line_items"),
         metrics_table=os.environ.get("BQ_METRICS_TABLE", "extraction_metrics"),
+        extracted_subscription=os.environ.get(
+            "EXTRACTED_SUBSCRIPTION", "invoice-extracted-bigquery-writer"
+        ),
+        bq_batch_size=int(os.environ.get("BQ_BATCH_SIZE", "500")),
+        bq_batch_max_wait_ms=int(os.environ.get("BQ_BATCH_MAX_WAIT_MS", "1000")),
+        redis_host=os.environ.get("REDIS_HOST"),
+        redis_port=int(os.environ.get("REDIS_PORT", "6379")),
+        dedup_ttl_seconds=int(os.environ.get("DEDUP_TTL_SECONDS", "86400")),
+        trust_upstream=os.environ.get("TRUST_UPSTREAM_EXTRACTION", "false").lower() == "true",
         langfuse_public_key=langfuse_public_key,
         langfuse_secret_key=langfuse_secret_key,
         langfuse_base_url=os.environ.get("LANGFUSE_BASE_URL", "https://cloud.langfuse.com"),
@@ -74,10 +74,12 @@ def mock_bigquery_adapter():
     """Mock BigQuery adapter for unit tests."""
     adapter = MagicMock()
     adapter.invoice_exists.return_value = False
+    adapter.existing_invoice_ids.return_value = set()
     # Match actual method names from writer.py
     adapter.write_invoice_row.return_value = None
     adapter.write_line_item_rows.return_value = None
     adapter.write_metrics.return_value = None
+    adapter.write_rows_multi.return_value = None
     return adapter
 
 
@@ -0,0 +1,101 @@
+"""Unit tests for BigQuery writer batching.
+
+Tests size- and age-based flushing and ack/nack handling.
+No Pub/Sub or BigQuery calls are made during unit tests.
+"""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+from functions.bigquery_writer.batcher import InvoiceBatcher
+
+
+class TestInvoiceBatcher:
+    """Tests for InvoiceBatcher."""
+
+    def test_flushes_when_batch_full(self):
+        """Test buffer is flushed once batch_size items are added."""
+        flush = MagicMock()
+        batcher = InvoiceBatcher(flush=flush, batch_size=3, max_wait_ms=60_000)
+
+        for i in range(3):
+            batcher.add(i, ack=MagicMock(), nack=MagicMock())
+
+        flush.assert_called_once_with([0, 1, 2])
+        assert len(batcher) == 0
+        batcher.close()
+
+    def test_acks_after_successful_flush(self):
+        """Test every message in the batch is acked after the flush."""
+        batcher = InvoiceBatcher(flush=MagicMock(), batch_size=2, max_wait_ms=60_000)
+        acks = [MagicMock(), MagicMock()]
+        nacks = [MagicMock(), MagicMock()]
+
+        for ack, nack in zip(acks, nacks, strict=True):
+            batcher.add("row", ack=ack, nack=nack)
+
+        for ack, nack in zip(acks, nacks, strict=True):
+            ack.assert_called_once()
+            nack.assert_not_called()
+        batcher.close()
+
+    def test_nacks_on_flush_failure(self):
+        """Test every message in the batch is nacked if the flush raises."""
+        flush = MagicMock(side_effect=RuntimeError("BQ Error"))
+        batcher = InvoiceBatcher(flush=flush, batch_size=2, max_wait_ms=60_000)
+        ack, nack = MagicMock(), MagicMock()
+
+        batcher.add("row", ack=ack, nack=nack)
+        batcher.add("row", ack=MagicMock(), nack=MagicMock())
+
+        nack.assert_called_once()
+        ack.assert_not_called()
+        batcher.close()
+
+    def test_flushes_after_max_wait(self):
+        """Test a partial batch is flushed once the oldest item is too old."""
+        flushed = threading.Event()
+        batcher = InvoiceBatcher(flush=lambda items: flushed.set(), batch_size=100, max_wait_ms=50)
+
+        batcher.add("row", ack=MagicMock(), nack=MagicMock())
+
+        assert flushed.wait(timeout=2)
+        batcher.close()
+
+    def test_leftover_keeps_original_age(self):
+        """Test items left after a partial flush keep their own max-wait deadline."""
+        clock = MagicMock(return_value=0.0)
+        flushed: list[list[str]] = []
+        leftover_flushed = threading.Event()
+
+        def flush(items):
+            flushed.append(items)
+            if items == ["c"]:
+                leftover_flushed.set()
+
+        with patch("functions.bigquery_writer.batcher.time.monotonic", clock):
+            batcher = InvoiceBatcher(flush=flush, batch_size=10, max_wait_ms=1000)
+            for item in ("a", "b", "c"):
+                batcher.add(item, ack=MagicMock(), nack=MagicMock())
+
+            # Partial flush just before "c" is due: it must not restart c's window
+            batcher._batch_size = 2
+            clock.return_value = 0.9
+            batcher.flush()
+            clock.return_value = 1.0
+
+            assert leftover_flushed.wait(timeout=2)
+            batcher.close()
+
+        assert flushed == [["a", "b"], ["c"]]
+
+    def test_close_drains_buffer(self):
+        """Test close flushes everything still buffered."""
+        flush = MagicMock()
+        batcher = InvoiceBatcher(flush=flush, batch_size=100, max_wait_ms=60_000)
+
+        batcher.add("a", ack=MagicMock(), nack=MagicMock())
+        batcher.add("b", ack=MagicMock(), nack=MagicMock())
+        batcher.close()
+
+        flush.assert_called_once_with(["a", "b"])
@@ -0,0 +1,90 @@
+"""Unit tests for GCP BigQuery adapter write ordering.
+
+Tests that write_rows_multi commits line items before the invoice row
+and treats metrics as best effort. Clients and streams are mocked; no
+BigQuery calls are made during unit tests.
+"""
+
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from functions.bigquery_writer.writer import _prepare_invoice_row, _prepare_line_item_rows
+from shared.adapters.bigquery import GCPBigQueryAdapter
+
+
+def _done(response=None, error=None) -> Future:
+    """Build an already-resolved append future."""
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(response or MagicMock(row_errors=[]))
+    return future
+
+
+@pytest.fixture
+def adapter():
+    """Adapter with a mocked BigQuery client and per-table append streams."""
+    with patch("google.cloud.bigquery.Client"):
+        bq_adapter = GCPBigQueryAdapter(project_id="test-project")
+
+    sent: list[str] = []
+    results: dict[str, Future] = {}
+
+    def get_stream(dataset, table, descriptor):
+        stream = MagicMock()
+
+        def send(request):
+            sent.append(table)
+            return results.get(table) or _done()
+
+        stream.send.side_effect = send
+        return stream
+
+    bq_adapter._get_append_stream = get_stream
+    bq_adapter.sent = sent
+    bq_adapter.results = results
+    return bq_adapter
+
+
+def _write(bq_adapter, invoice):
+    return bq_adapter.write_rows_multi(
+        "test_dataset",
+        invoices_table="invoices",
+        invoice_rows=[_prepare_invoice_row(invoice)],
+        line_items_table="line_items",
+        line_item_rows=_prepare_line_item_rows(invoice),
+        metrics_table="metrics",
+        metrics_rows=[{"invoice_id": invoice.invoice_id, "success": True}],
+    )
+
+
+class TestWriteRowsMulti:
+    """Tests for GCPBigQueryAdapter.write_rows_multi."""
+
+    def test_invoice_row_written_last(self, adapter, sample_invoice):
+        """Test the invoice append is only sent after line items and metrics."""
+        rows = _write(adapter, sample_invoice)
+
+        assert adapter.sent == ["line_items", "metrics", "invoices"]
+        assert rows == 1 + len(sample_invoice.line_items) + 1
+
+    def test_line_item_failure_skips_invoice(self, adapter, sample_invoice):
+        """Test a failed line item append raises before the invoice is written."""
+        adapter.results["line_items"] = _done(error=RuntimeError("append failed"))
+
+        with pytest.raises(RuntimeError, match="append failed"):
+            _write(adapter, sample_invoice)
+
+        assert "invoices" not in adapter.sent
+
+    def test_metrics_failure_is_best_effort(self, adapter, sample_invoice):
+        """Test a failed metrics append still writes the invoice row."""
+        adapter.results["metrics"] = _done(error=RuntimeError("metrics down"))
+
+        rows = _write(adapter, sample_invoice)
+
+        assert adapter.sent[-1] == "invoices"
+        assert rows == 1 + len(sample_invoice.line_items)
@@ -0,0 +1,51 @@
+"""Unit tests for Storage Write API row types.
+
+Tests conversion of prepared row dicts into proto messages.
+No BigQuery calls are made during unit tests.
+"""
+
+from functions.bigquery_writer.writer import _prepare_invoice_row, _prepare_line_item_rows
+from shared.adapters.bigquery_rows import InvoiceRow, LineItemRow, MetricsRow, to_proto_rows
+
+
+class TestToProtoRows:
+    """Tests for to_proto_rows conversion."""
+
+    def test_invoice_row_fields(self, sample_invoice):
+        """Test prepared invoice rows convert field by field."""
+        row = _prepare_invoice_row(sample_invoice, source_file="gs://bucket/file.tiff")
+
+        (message,) = to_proto_rows(InvoiceRow, [row])
+
+        assert message.invoice_id == sample_invoice.invoice_id
+        assert message.vendor_type == sample_invoice.vendor_type.value
+        assert message.total_amount == float(sample_invoice.total_amount)
+        assert message.source_file == "gs://bucket/file.tiff"
+
+    def test_date_as_days_since_epoch(self):
+        """Test DATE columns are encoded as days since 1970-01-01."""
+        (message,) = to_proto_rows(InvoiceRow, [{"invoice_date": "1970-01-11"}])
+
+        assert message.invoice_date == 10
+
+    def test_timestamp_as_epoch_micros(self):
+        """Test TIMESTAMP columns are encoded as microseconds since epoch."""
+        (message,) = to_proto_rows(MetricsRow, [{"created_at": "1970-01-01T00:00:01+00:00"}])
+
+        assert message.created_at == 1_000_000
+
+    def test_none_left_unset(self):
+        """Test None values are left unset so BigQuery stores NULL."""
+        (message,) = to_proto_rows(MetricsRow, [{"invoice_id": "TEST-001", "error_message": None}])
+
+        assert message.HasField("invoice_id")
+        assert not message.HasField("error_message")
+
+    def test_line_item_rows(self, sample_invoice):
+        """Test one message is produced per line item row."""
+        rows = _prepare_line_item_rows(sample_invoice)
+
+        messages = to_proto_rows(LineItemRow, rows)
+
+        assert len(messages) == len(sample_invoice.line_items)
+        assert [m.line_number for m in messages] == list(range(1, len(rows) + 1))
@@ -0,0 +1,132 @@
+"""Unit tests for the BigQuery writer push handler.
+
+Tests the Redis dedup cache in front of invoice loading and BigQuery
+writes. Adapters are mocked; no GCP or Redis calls are made.
+"""
+
+import base64
+import logging
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+from cloudevents.http import CloudEvent
+
+from functions.bigquery_writer import main
+from functions.bigquery_writer.writer import WriteResult
+from tests.fixtures.sample_invoices import SAMPLE_EXTRACTED_INVOICE
+
+SOURCE_FILE = "gs://bucket/landing/ubereats_INV-UE-001.tiff"
+
+
+def _event() -> CloudEvent:
+    """Build the push CloudEvent for a valid invoice-extracted message."""
+    payload = {
+        "source_file": SOURCE_FILE,
+        "vendor_type": "ubereats",
+        "extraction_model": "gemini-2.5-flash",
+        "extraction_latency_ms": 1500,
+        "confidence_score": 0.92,
+        "extracted_data": SAMPLE_EXTRACTED_INVOICE.model_dump(mode="json"),
+    }
+    data = base64.b64encode(orjson.dumps(payload)).decode()
+    return CloudEvent({"type": "pubsub", "source": "test"}, {"message": {"data": data}})
+
+
+@pytest.fixture
+def config():
+    """Config with the dedup cache enabled."""
+    return MagicMock(
+        redis_host="10.0.0.3",
+        redis_port=6379,
+        dedup_ttl_seconds=3600,
+        trust_upstream=False,
+    )
+
+
+@pytest.fixture
+def cache():
+    """Dedup cache that misses by default."""
+    cache = MagicMock()
+    cache.get.return_value = None
+    return cache
+
+
+@pytest.fixture
+def handler(config, cache):
+    """Patch the handler's config, adapters, invoice loading and writes."""
+    with (
+        patch.object(main, "get_config", return_value=config),
+        patch.object(main, "get_bq_adapter"),
+        patch.object(main, "_get_cache_adapter", return_value=cache) as get_cache,
+        patch.object(main, "load_invoice", return_value=SAMPLE_EXTRACTED_INVOICE) as load,
+        patch.object(main, "write_invoice_to_bigquery") as write,
+        patch.object(main, "record_failure") as record_failure,
+    ):
+        write.return_value = WriteResult(
+            success=True,
+            invoice_id=SAMPLE_EXTRACTED_INVOICE.invoice_id,
+            is_duplicate=False,
+            rows_written=3,
+        )
+        yield MagicMock(get_cache=get_cache, load=load, write=write, record_failure=record_failure)
+
+
+class TestDedupCache:
+    """Tests for the Redis dedup cache in handle_invoice_extracted."""
+
+    def test_hit_skips_load_and_write(self, handler, cache, caplog):
+        """Test a cached invoice is neither loaded nor written, with one log line."""
+        cache.get.return_value = b"1"
+        caplog.set_level(logging.INFO, logger=main.logger.name)
+
+        main.handle_invoice_extracted(_event())
+
+        handler.load.assert_not_called()
+        handler.write.assert_not_called()
+        handler.record_failure.assert_not_called()
+        duplicate_logs = [r for r in caplog.records if "Duplicate invoice" in r.getMessage()]
+        assert len(duplicate_logs) == 1
+        assert duplicate_logs[0].cache_hit is True
+
+    def test_miss_then_write_sets_key(self, handler, config, cache):
+        """Test a persisted invoice is remembered with the configured TTL."""
+        main.handle_invoice_extracted(_event())
+
+        key = main._dedup_key(SOURCE_FILE, SAMPLE_EXTRACTED_INVOICE.invoice_id)
+        cache.get.assert_called_once_with(key)
+        handler.write.assert_called_once()
+        cache.set.assert_called_once_with(key, "1", config.dedup_ttl_seconds)
+
+    def test_cache_error_treated_as_miss(self, handler, cache):
+        """Test a failing cache lookup still writes the invoice."""
+        cache.get.side_effect = ConnectionError("redis down")
+
+        main.handle_invoice_extracted(_event())
+
+        handler.write.assert_called_once()
+        handler.record_failure.assert_not_called()
+
+    def test_failed_write_not_cached(self, handler, cache):
+        """Test an invoice that was not persisted is not remembered."""
+        handler.write.return_value = WriteResult(
+            success=False,
+            invoice_id=SAMPLE_EXTRACTED_INVOICE.invoice_id,
+            is_duplicate=False,
+            rows_written=0,
+            error="BQ Error",
+        )
+
+        main.handle_invoice_extracted(_event())
+
+        cache.set.assert_not_called()
+        handler.record_failure.assert_called_once()
+
+    def test_no_cache_without_redis_host(self, handler, config):
+        """Test the cache is never touched when redis_host is unset."""
+        config.redis_host = None
+
+        main.handle_invoice_extracted(_event())
+
+        handler.get_cache.assert_not_called()
+        handler.write.assert_called_once()
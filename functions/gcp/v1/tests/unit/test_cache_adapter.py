@@ -0,0 +1,48 @@
+"""Unit tests for the Redis dedup cache adapter.
+
+The Redis client is mocked; no Redis calls are made during unit tests.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from shared.adapters.cache import RedisCacheAdapter
+
+
+@pytest.fixture
+def redis_client():
+    """Mocked redis.Redis client created by the adapter."""
+    with patch("redis.Redis") as redis_cls:
+        yield redis_cls
+
+
+class TestRedisCacheAdapter:
+    """Tests for RedisCacheAdapter."""
+
+    def test_client_uses_timeouts(self, redis_client):
+        """Test connect and read timeouts are applied so a slow cache cannot stall."""
+        RedisCacheAdapter(host="10.0.0.3", port=6380, timeout_seconds=0.2)
+
+        redis_client.assert_called_once_with(
+            host="10.0.0.3",
+            port=6380,
+            socket_timeout=0.2,
+            socket_connect_timeout=0.2,
+        )
+
+    def test_get_returns_cached_value(self, redis_client):
+        """Test get returns the raw value, or None on a miss."""
+        redis_client.return_value.get.side_effect = [b"1", None]
+        cache = RedisCacheAdapter(host="10.0.0.3")
+
+        assert cache.get("present") == b"1"
+        assert cache.get("missing") is None
+
+    def test_set_uses_setex(self, redis_client):
+        """Test set stores the value with its TTL in one SETEX call."""
+        cache = RedisCacheAdapter(host="10.0.0.3")
+
+        cache.set("key", "1", 3600)
+
+        redis_client.return_value.setex.assert_called_once_with("key", 3600, "1")
@@ -0,0 +1,188 @@
+"""Unit tests for BigQuery writer failure recording.
+
+Tests error record truncation and error file uploads in isolation.
+No GCP calls are made during unit tests.
+"""
+
+import queue
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.api_core.exceptions import PreconditionFailed
+
+from functions.bigquery_writer import failures
+
+
+class TestTruncateForError:
+    """Tests for _truncate_for_error."""
+
+    def test_long_string_truncated(self):
+        """Test strings over max_str are cut and their path reported."""
+        trimmed, paths = failures._truncate_for_error({"notes": "x" * 30}, max_str=10, path="data")
+
+        assert trimmed == {"notes": "x" * 10}
+        assert paths == ["data.notes"]
+
+    def test_long_list_truncated(self):
+        """Test lists over max_list keep the first items and report the list path."""
+        trimmed, paths = failures._truncate_for_error({"items": list(range(8))}, max_list=3)
+
+        assert trimmed == {"items": [0, 1, 2]}
+        assert paths == ["items"]
+
+    def test_nested_paths_use_indices(self):
+        """Test nested truncations are reported with [i] list indices."""
+        data = {"line_items": [{"description": "ok"}, {"description": "y" * 20}]}
+
+        trimmed, paths = failures._truncate_for_error(data, max_str=5, path="extracted_data")
+
+        assert trimmed["line_items"][1]["description"] == "y" * 5
+        assert paths == ["extracted_data.line_items[1].description"]
+
+    def test_small_payload_unchanged(self):
+        """Test payloads within limits come back equal with no paths."""
+        data = {"invoice_id": "UE-1", "amounts": [1, 2.5, None, True]}
+
+        trimmed, paths = failures._truncate_for_error(data)
+
+        assert trimmed == data
+        assert paths == []
+
+    def test_input_not_modified(self):
+        """Test the caller's dict and lists are left untouched."""
+        data = {"notes": "x" * 30, "items": [{"name": "z" * 30}] * 5}
+        original = {"notes": "x" * 30, "items": [{"name": "z" * 30}] * 5}
+
+        failures._truncate_for_error(data, max_str=10, max_list=2)
+
+        assert data == original
+
+
+class TestWriteFailureToBucket:
+    """Tests for _write_failure_to_bucket."""
+
+    @pytest.fixture
+    def config(self):
+        return MagicMock(project_id="test-project", failed_bucket="failed")
+
+    def _write(self, config, **kwargs):
+        return failures._write_failure_to_bucket(
+            config=config,
+            source_file="gs://bucket/landing/ubereats_INV-UE-001.tiff",
+            invoice_id="INV-UE-001",
+            error=ValueError("bad data"),
+            raw_message={},
+            message=None,
+            **kwargs,
+        )
+
+    def test_uploads_before_returning(self, config):
+        """Test the push path uploads synchronously and create-only."""
+        storage = MagicMock()
+        storage.write.return_value = "gs://failed/ubereats_INV-UE-001.error.json"
+
+        with (
+            patch.object(failures, "get_gcs_adapter", return_value=storage),
+            patch.object(failures, "_FAILURE_QUEUE") as failure_queue,
+        ):
+            gcs_uri = self._write(config)
+
+        assert gcs_uri == "gs://failed/ubereats_INV-UE-001.error.json"
+        assert storage.write.call_args.kwargs["if_generation_match"] == 0
+        failure_queue.put.assert_not_called()
+
+    def test_existing_error_file_kept(self, config):
+        """Test an error file that already exists is reported, not overwritten."""
+        storage = MagicMock()
+        storage.write.side_effect = PreconditionFailed("exists")
+
+        with patch.object(failures, "get_gcs_adapter", return_value=storage):
+            gcs_uri = self._write(config)
+
+        assert gcs_uri == "gs://failed/ubereats_INV-UE-001.error.json"
+
+    def test_background_queues_upload(self, config):
+        """Test writes with ack/nack are queued for the flusher thread."""
+        storage = MagicMock()
+
+        with (
+            patch.object(failures, "get_gcs_adapter", return_value=storage),
+            patch.object(failures, "_start_failure_flusher"),
+            patch.object(failures, "_FAILURE_QUEUE") as failure_queue,
+        ):
+            self._write(config, ack=MagicMock(), nack=MagicMock())
+
+        storage.write.assert_not_called()
+        project_id, bucket, path, *_ = failure_queue.put.call_args.args[0]
+        assert (project_id, bucket, path) == (
+            "test-project",
+            "failed",
+            "ubereats_INV-UE-001.error.json",
+        )
+
+
+class TestUploadQueuedFailures:
+    """Tests for the failure flusher loop."""
+
+    def _run(self, storage, *items):
+        failure_queue = queue.Queue()
+        for item in (*items, None):
+            failure_queue.put(item)
+
+        with (
+            patch.object(failures, "get_gcs_adapter", return_value=storage),
+            patch.object(failures, "_FAILURE_QUEUE", failure_queue),
+        ):
+            failures._upload_queued_failures()
+
+    def test_acks_after_upload(self):
+        """Test the message is acked only once its error file is written."""
+        storage = MagicMock()
+        ack, nack = MagicMock(), MagicMock()
+
+        self._run(storage, ("test-project", "failed", "a.error.json", b"{}", ack, nack))
+
+        storage.write.assert_called_once()
+        ack.assert_called_once()
+        nack.assert_not_called()
+
+    def test_nacks_failed_upload(self):
+        """Test a failed upload nacks the message so it is redelivered."""
+        storage = MagicMock()
+        storage.write.side_effect = [RuntimeError("GCS down"), "gs://failed/b.error.json"]
+        first = (MagicMock(), MagicMock())
+        second = (MagicMock(), MagicMock())
+
+        self._run(
+            storage,
+            ("test-project", "failed", "a.error.json", b"{}", *first),
+            ("test-project", "failed", "b.error.json", b"{}", *second),
+        )
+
+        first[0].assert_not_called()
+        first[1].assert_called_once()
+        second[0].assert_called_once()
+
+
+class TestDrainFailureQueue:
+    """Tests for drain_failure_queue."""
+
+    def test_uploads_queued_then_stops(self):
+        """Test draining uploads everything queued and is safe to repeat."""
+        storage = MagicMock()
+        ack = MagicMock()
+
+        with (
+            patch.object(failures, "get_gcs_adapter", return_value=storage),
+            patch.object(failures, "_FAILURE_QUEUE", queue.Queue()),
+        ):
+            thread = failures._start_failure_flusher()
+            failures._FAILURE_QUEUE.put(
+                ("test-project", "failed", "a.error.json", b"{}", ack, MagicMock())
+            )
+
+            failures.drain_failure_queue()
+            failures.drain_failure_queue()
+
+        assert not thread.is_alive()
+        ack.assert_called_once()
@@ -0,0 +1,135 @@
+"""Unit tests for BigQuery writer message processing helpers.
+
+Tests adapter reset and trusted invoice loading in isolation.
+No GCP calls are made during unit tests.
+"""
+
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.api_core.exceptions import ServiceUnavailable
+from pydantic import ValidationError
+
+from functions.bigquery_writer import processing
+from functions.bigquery_writer.writer import _prepare_invoice_row, _prepare_line_item_rows
+from shared.schemas.invoice import ExtractedInvoice
+from tests.fixtures.sample_invoices import SAMPLE_EXTRACTED_INVOICE
+
+
+class TestResetAdaptersOnConnectionError:
+    """Tests for reset_adapters_on_connection_error."""
+
+    def test_resets_on_connection_error(self):
+        """Test a connection-level error clears the cached adapters."""
+        with patch.object(processing, "get_bq_adapter") as get_bq:
+            processing.reset_adapters_on_connection_error(ServiceUnavailable("down"))
+
+        get_bq.cache_clear.assert_called_once()
+
+    def test_resets_on_wrapped_connection_error(self):
+        """Test a RuntimeError raised from a connection error also resets."""
+        try:
+            raise RuntimeError("BigQuery write failed") from ServiceUnavailable("down")
+        except RuntimeError as e:
+            error = e
+
+        with patch.object(processing, "get_bq_adapter") as get_bq:
+            processing.reset_adapters_on_connection_error(error)
+
+        get_bq.cache_clear.assert_called_once()
+
+    def test_ignores_other_errors(self):
+        """Test unrelated errors keep the cached adapters."""
+        with patch.object(processing, "get_bq_adapter") as get_bq:
+            processing.reset_adapters_on_connection_error(ValueError("bad data"))
+
+        get_bq.cache_clear.assert_not_called()
+
+
+def _without_timestamps(rows: list[dict]) -> list[dict]:
+    """Drop per-call timestamps so rows from two builds can be compared."""
+    return [
+        {key: value for key, value in row.items() if key not in ("created_at", "updated_at")}
+        for row in rows
+    ]
+
+
+@pytest.fixture
+def extracted_data() -> dict:
+    """Upstream extracted_data payload as it arrives on the topic."""
+    return SAMPLE_EXTRACTED_INVOICE.model_dump(mode="json")
+
+
+class TestConstructTrustedInvoice:
+    """Tests for _construct_trusted_invoice."""
+
+    def test_rows_match_validated_path(self, extracted_data):
+        """Test trusted and validated invoices produce the same BigQuery rows."""
+        trusted = processing._construct_trusted_invoice(extracted_data)
+        validated = ExtractedInvoice.model_validate(extracted_data)
+
+        assert _without_timestamps([_prepare_invoice_row(trusted)]) == _without_timestamps(
+            [_prepare_invoice_row(validated)]
+        )
+        assert _without_timestamps(_prepare_line_item_rows(trusted)) == _without_timestamps(
+            _prepare_line_item_rows(validated)
+        )
+
+    def test_string_quantity_coerced(self, extracted_data):
+        """Test a numeric-string quantity is coerced like the validated path."""
+        extracted_data["line_items"][0]["quantity"] = "2"
+
+        trusted = processing._construct_trusted_invoice(extracted_data)
+        validated = ExtractedInvoice.model_validate(extracted_data)
+
+        assert trusted.line_items[0].quantity == 2
+        assert trusted.line_items[0].amount == validated.line_items[0].amount
+
+    def test_none_decimals_become_zero(self, extracted_data):
+        """Test null optional decimals become 0, as the schema validator does."""
+        extracted_data.update(tax_amount=None, commission_rate=None, commission_amount=None)
+
+        trusted = processing._construct_trusted_invoice(extracted_data)
+
+        assert trusted.tax_amount == Decimal("0")
+        assert trusted.commission_rate == Decimal("0")
+        assert trusted.commission_amount == Decimal("0")
+
+
+class TestLoadInvoice:
+    """Tests for load_invoice."""
+
+    def test_trusted_path_skips_validation(self, extracted_data):
+        """Test trust_upstream builds the invoice without running validators."""
+        config = MagicMock(trust_upstream=True)
+
+        with patch.object(processing.INV_VALIDATOR, "validate_python") as validate:
+            invoice = processing.load_invoice(config, extracted_data)
+
+        validate.assert_not_called()
+        assert invoice.invoice_id == SAMPLE_EXTRACTED_INVOICE.invoice_id
+
+    def test_falls_back_on_bad_shape(self, extracted_data):
+        """Test a payload the trusted path cannot build gets a real ValidationError."""
+        del extracted_data["subtotal"]
+        config = MagicMock(trust_upstream=True)
+
+        with pytest.raises(ValidationError):
+            processing.load_invoice(config, extracted_data)
+
+    def test_falls_back_on_bad_quantity(self, extracted_data):
+        """Test an unconvertible quantity falls back to full validation."""
+        extracted_data["line_items"][0]["quantity"] = "two"
+        config = MagicMock(trust_upstream=True)
+
+        with pytest.raises(ValidationError):
+            processing.load_invoice(config, extracted_data)
+
+    def test_validates_when_not_trusted(self, extracted_data):
+        """Test full validation runs when trust_upstream is off."""
+        extracted_data["subtotal"] = "-1"
+        config = MagicMock(trust_upstream=False)
+
+        with pytest.raises(ValidationError):
+            processing.load_invoice(config, extracted_data)
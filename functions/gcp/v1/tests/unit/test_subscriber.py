@@ -0,0 +1,129 @@
+"""Unit tests for the BigQuery writer streaming-pull callback.
+
+Tests that every pulled message is either handed to the batcher or
+recorded as a failure that acks it once written. No Pub/Sub or GCP
+calls are made.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+
+from functions.bigquery_writer import subscriber
+from tests.fixtures.sample_invoices import SAMPLE_EXTRACTED_INVOICE
+
+
+def _pulled(payload) -> MagicMock:
+    """Build a pulled Pub/Sub message carrying payload."""
+    pubsub_message = MagicMock()
+    pubsub_message.data = payload if isinstance(payload, bytes) else orjson.dumps(payload)
+    return pubsub_message
+
+
+@pytest.fixture
+def valid_payload() -> dict:
+    """Invoice-extracted message payload that passes validation."""
+    return {
+        "source_file": "gs://bucket/landing/ubereats_INV-UE-001.tiff",
+        "vendor_type": "ubereats",
+        "extraction_model": "gemini-2.5-flash",
+        "extraction_latency_ms": 1500,
+        "confidence_score": 0.92,
+        "extracted_data": SAMPLE_EXTRACTED_INVOICE.model_dump(mode="json"),
+    }
+
+
+@pytest.fixture
+def record_failure():
+    """Patch out failure recording and the adapter it is given."""
+    with (
+        patch.object(subscriber, "record_failure") as record,
+        patch.object(subscriber, "get_bq_adapter"),
+    ):
+        record.return_value = "gs://failed/ubereats_INV-UE-001.error.json"
+        yield record
+
+
+class TestHandleMessage:
+    """Tests for _handle_message."""
+
+    def _handle(self, pubsub_message, batcher):
+        subscriber._handle_message(
+            pubsub_message, config=MagicMock(trust_upstream=False), batcher=batcher
+        )
+
+    def test_valid_message_goes_to_batcher(self, valid_payload, record_failure):
+        """Test a valid message is buffered and left for the batcher to ack."""
+        batcher = MagicMock()
+        pubsub_message = _pulled(valid_payload)
+
+        self._handle(pubsub_message, batcher)
+
+        batcher.add.assert_called_once()
+        assert batcher.add.call_args.args[0].invoice_id == SAMPLE_EXTRACTED_INVOICE.invoice_id
+        pubsub_message.ack.assert_not_called()
+        record_failure.assert_not_called()
+
+    def test_invalid_json_recorded_for_flusher_ack(self, record_failure):
+        """Test an undecodable message is queued, leaving the ack to the flusher."""
+        batcher = MagicMock()
+        pubsub_message = _pulled(b"not json")
+
+        self._handle(pubsub_message, batcher)
+
+        batcher.add.assert_not_called()
+        record_failure.assert_called_once()
+        assert record_failure.call_args.kwargs["ack"] is pubsub_message.ack
+        assert record_failure.call_args.kwargs["nack"] is pubsub_message.nack
+        pubsub_message.ack.assert_not_called()
+
+    def test_unexpected_error_recorded(self, valid_payload, record_failure):
+        """Test errors outside validation are recorded instead of escaping the callback."""
+        batcher = MagicMock()
+        pubsub_message = _pulled(valid_payload)
+
+        with patch.object(subscriber, "prepare_invoice", side_effect=TypeError("bad row")):
+            self._handle(pubsub_message, batcher)
+
+        batcher.add.assert_not_called()
+        assert isinstance(record_failure.call_args.kwargs["error"], TypeError)
+        assert record_failure.call_args.kwargs["ack"] is pubsub_message.ack
+
+    def test_acked_if_failure_not_queued(self, record_failure):
+        """Test the message is acked here when the error file could not be queued."""
+        record_failure.return_value = None
+        pubsub_message = _pulled(b"not json")
+
+        self._handle(pubsub_message, MagicMock())
+
+        pubsub_message.ack.assert_called_once()
+
+    def test_value_error_logged_as_exception(self, valid_payload, record_failure):
+        """Test a ValueError outside decoding/validation is not downgraded to a warning."""
+        with (
+            patch.object(subscriber, "prepare_invoice", side_effect=ValueError("bad row")),
+            patch.object(subscriber, "logger") as logger,
+        ):
+            self._handle(_pulled(valid_payload), MagicMock())
+
+        logger.exception.assert_called_once()
+        logger.warning.assert_not_called()
+
+    def test_invalid_json_logged_as_warning(self, record_failure):
+        """Test decode errors stay warnings, like validation errors."""
+        with patch.object(subscriber, "logger") as logger:
+            self._handle(_pulled(b"not json"), MagicMock())
+
+        logger.warning.assert_called_once()
+        logger.exception.assert_not_called()
+
+    def test_acked_even_if_recording_fails(self, record_failure):
+        """Test the message is acked even when the failure cannot be recorded."""
+        record_failure.side_effect = RuntimeError("GCS down")
+        pubsub_message = _pulled(b"not json")
+
+        with pytest.raises(RuntimeError):
+            self._handle(pubsub_message, MagicMock())
+
+        pubsub_message.ack.assert_called_once()
@@ -7,10 +7,13 @@ No actual BigQuery calls are made during unit tests.
 import pytest
 
 from functions.bigquery_writer.writer import (
+    PreparedInvoice,
     WriteResult,
     _prepare_invoice_row,
     _prepare_line_item_rows,
+    prepare_invoice,
     write_extraction_metrics,
+    write_invoice_batch,
     write_invoice_to_bigquery,
 )
 from shared.schemas.invoice import VendorType
@@ -85,9 +88,35 @@ class TestWriteInvoiceToBigQuery:
         assert invoice_row["extraction_latency_ms"] == 500
         assert invoice_row["confidence_score"] == 0.95
 
+    def test_metrics_fused_into_single_write(self, mock_bigquery_adapter, sample_invoice):
+        """Test metrics_table fuses invoice, line item and metrics writes."""
+        result = write_invoice_to_bigquery(
+            invoice=sample_invoice,
+            bq_adapter=mock_bigquery_adapter,
+            dataset="test_dataset",
+            invoices_table="invoices",
+            line_items_table="line_items",
+            source_file="gs://bucket/file.tiff",
+            extraction_model="gemini-2.5-flash",
+            extraction_latency_ms=500,
+            confidence_score=0.95,
+            metrics_table="metrics",
+        )
+
+        mock_bigquery_adapter.write_rows_multi.assert_called_once()
+        mock_bigquery_adapter.write_invoice_row.assert_not_called()
+        mock_bigquery_adapter.write_line_item_rows.assert_not_called()
+
+        call_kwargs = mock_bigquery_adapter.write_rows_multi.call_args.kwargs
+        assert call_kwargs["metrics_table"] == "metrics"
+        assert call_kwargs["metrics_rows"][0]["success"] is True
+        assert len(call_kwargs["line_item_rows"]) == len(sample_invoice.line_items)
+        assert result.rows_written == 1 + len(sample_invoice.line_items)
+
     def test_error_handling(self, mock_bigquery_adapter, sample_invoice):
         """Test errors are captured in result."""
-        mock_bigquery_adapter.write_invoice_row.side_effect = Exception("BQ Error")
+        error = Exception("BQ Error")
+        mock_bigquery_adapter.write_invoice_row.side_effect = error
 
         result = write_invoice_to_bigquery(
             invoice=sample_invoice,
@@ -99,6 +128,7 @@ class TestWriteInvoiceToBigQuery:
 
         assert not result.success
         assert "BQ Error" in result.error
+        assert result.exception is error
 
 
 class TestPrepareInvoiceRow:
@@ -245,3 +275,123 @@ class TestWriteExtractionMetrics:
         )
 
         assert result is False
+
+
+class TestWriteInvoiceBatch:
+    """Tests for bulk write_invoice_batch function."""
+
+    @staticmethod
+    def _prepare(invoice) -> PreparedInvoice:
+        return prepare_invoice(
+            invoice,
+            source_file="gs://bucket/file.tiff",
+            extraction_model="gemini-2.5-flash",
+            extraction_latency_ms=500,
+            confidence_score=0.95,
+        )
+
+    def test_single_fused_write(self, mock_bigquery_adapter, sample_invoice):
+        """Test a batch is written with a single adapter call."""
+        second = sample_invoice.model_copy(update={"invoice_id": "UE-2026-009999"})
+        batch = [self._prepare(sample_invoice), self._prepare(second)]
+
+        result = write_invoice_batch(
+            batch,
+            bq_adapter=mock_bigquery_adapter,
+            dataset="test_dataset",
+            invoices_table="invoices",
+            line_items_table="line_items",
+            metrics_table="metrics",
+        )
+
+        # One duplicate check per table that gates the write
+        checks = mock_bigquery_adapter.existing_invoice_ids.call_args_list
+        assert [call.args[1] for call in checks] == ["invoices", "line_items"]
+        mock_bigquery_adapter.write_rows_multi.assert_called_once()
+
+        invoice_rows = mock_bigquery_adapter.write_rows_multi.call_args.kwargs["invoice_rows"]
+        assert [row["invoice_id"] for row in invoice_rows] == [
+            sample_invoice.invoice_id,
+            "UE-2026-009999",
+        ]
+        assert result.invoices_written == 2
+        assert result.duplicates == 0
+
+    def test_duplicates_skipped(self, mock_bigquery_adapter, sample_invoice):
+        """Test existing and in-batch duplicates are not re-inserted."""
+        mock_bigquery_adapter.existing_invoice_ids.return_value = {"UE-2026-009999"}
+        second = sample_invoice.model_copy(update={"invoice_id": "UE-2026-009999"})
+        batch = [
+            self._prepare(sample_invoice),
+            self._prepare(sample_invoice),
+            self._prepare(second),
+        ]
+
+        result = write_invoice_batch(
+            batch,
+            bq_adapter=mock_bigquery_adapter,
+            dataset="test_dataset",
+            invoices_table="invoices",
+            line_items_table="line_items",
+            metrics_table="metrics",
+        )
+
+        call_kwargs = mock_bigquery_adapter.write_rows_multi.call_args.kwargs
+        invoice_rows = call_kwargs["invoice_rows"]
+        metrics_rows = call_kwargs["metrics_rows"]
+        assert len(invoice_rows) == 1
+        assert len(metrics_rows) == 3
+        assert result.duplicates == 2
+
+    def test_retry_after_failed_invoice_append(self, mock_bigquery_adapter, sample_invoice):
+        """Test a batch retried after the invoice append failed writes line items once."""
+        tables: dict[str, list[dict]] = {"invoices": [], "line_items": [], "metrics": []}
+
+        def existing_invoice_ids(dataset, table, invoice_ids):
+            return {row["invoice_id"] for row in tables[table]} & set(invoice_ids)
+
+        def write_rows_multi(dataset, **kwargs):
+            # Same order as the adapter: line items and metrics, then invoices
+            tables["line_items"].extend(kwargs["line_item_rows"])
+            tables["metrics"].extend(kwargs["metrics_rows"])
+            if write_rows_multi.fail_invoices:
+                write_rows_multi.fail_invoices = False
+                raise RuntimeError("invoice append failed")
+            tables["invoices"].extend(kwargs["invoice_rows"])
+
+        write_rows_multi.fail_invoices = True
+        mock_bigquery_adapter.existing_invoice_ids.side_effect = existing_invoice_ids
+        mock_bigquery_adapter.write_rows_multi.side_effect = write_rows_multi
+        batch = [self._prepare(sample_invoice)]
+
+        def write():
+            return write_invoice_batch(
+                batch,
+                bq_adapter=mock_bigquery_adapter,
+                dataset="test_dataset",
+                invoices_table="invoices",
+                line_items_table="line_items",
+                metrics_table="metrics",
+            )
+
+        with pytest.raises(RuntimeError, match="invoice append failed"):
+            write()
+        result = write()
+
+        assert len(tables["invoices"]) == 1
+        assert len(tables["line_items"]) == len(sample_invoice.line_items)
+        assert result.invoices_written == 1
+
+    def test_errors_propagate(self, mock_bigquery_adapter, sample_invoice):
+        """Test adapter errors are raised so the batch can be nacked."""
+        mock_bigquery_adapter.write_rows_multi.side_effect = Exception("BQ Error")
+
+        with pytest.raises(Exception, match="BQ Error"):
+            write_invoice_batch(
+                [self._prepare(sample_invoice)],
+                bq_adapter=mock_bigquery_adapter,
+                dataset="test_dataset",
+                invoices_table="invoices",
+                line_items_table="line_items",
+                metrics_table="metrics",
+            )